@@ -0,0 +1,335 @@
+#!/usr/bin/python3
+
+import os, json
+from collections import deque
+
+# PyYAML is optional, plans can always be written as JSON
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+class BatchError(Exception):
+    '''
+    Raised when a plan or a step can't be run
+    '''
+
+class Batch:
+    '''
+    Stands in for the dialogs while lazywp runs headless. Message
+    boxes are collected, confirmations are answered by the yes flag
+    and inputs are taken from the step in order. Every wp call is
+    collected with its returncode, so a step fails if one of its
+    calls failed.
+
+    Attributes:
+        yes (bool): the answer to every confirmation
+        inputs (deque): the answers to the input boxes
+        messages (list): the collected messages
+        calls (list): the wp calls of the current step
+    '''
+    yes = False
+    inputs = None
+    messages = None
+    calls = None
+
+    def __init__(self, yes=False, inputs=[]):
+        self.reset(yes, inputs)
+
+    def reset(self, yes, inputs) -> None:
+        '''
+        Starts a new step
+
+        Parameters:
+            yes (bool): the answer to every confirmation
+            inputs (list): the answers to the input boxes
+
+        Returns:
+            void
+        '''
+        self.yes = yes
+        self.inputs = deque(str(value) for value in inputs)
+        self.messages = []
+        self.calls = []
+
+    def message(self, messages) -> None:
+        '''
+        Collects a message box. A box replacing a box with the same
+        first line is a progress update, only the last one is kept.
+
+        Parameters:
+            messages (list): the lines of the box
+
+        Returns:
+            void
+        '''
+        lines = [str(message) for message in messages]
+        if len(self.messages) != 0 and len(lines) != 0 and self.messages[-1][0] == lines[0]:
+            self.messages[-1] = lines
+            return
+        self.messages.append(lines)
+
+    def ask(self, messages) -> bool:
+        '''
+        Answers a confirmation by the yes flag
+
+        Parameters:
+            messages (list): the lines of the box
+
+        Returns:
+            bool: the yes flag
+        '''
+        self.messages.append([str(message) for message in messages] + [f"-> {'yes' if self.yes == True else 'no'}"])
+        return self.yes
+
+    def input(self, messages) -> str:
+        '''
+        Answers an input box with the next input of the step
+
+        Parameters:
+            messages (list): the lines of the box
+
+        Returns:
+            str: the input, empty if there is none left
+        '''
+        value = self.inputs.popleft() if len(self.inputs) != 0 else ''
+        self.messages.append([str(message) for message in messages] + [f"-> {value}"])
+        return value
+
+    def wp(self, command, returncode, output, optional=False) -> None:
+        '''
+        Collects a wp call, may be called from worker threads
+
+        Parameters:
+            command (str): the wp command
+            returncode (int): the returncode
+            output (str): the output
+            optional (bool): the caller handles a failure, the step doesn't fail
+
+        Returns:
+            void
+        '''
+        call = {'command': command, 'returncode': returncode}
+        if returncode != 0:
+            call['output'] = output.strip()
+        if optional == True:
+            call['optional'] = True
+        self.calls.append(call)
+
+def load_plan(path) -> dict:
+    '''
+    Loads a plan. Plans are JSON, or YAML if the file ends with .yml
+    or .yaml and PyYAML is installed.
+
+    A plan holds the steps, each with a command, an action and
+    optionally the items, all, the inputs and yes. The paths of
+    several WordPress installations and a global yes are optional.
+
+    Parameters:
+        path (str): the path of the plan
+
+    Returns:
+        dict: the plan
+    '''
+    try:
+        with open(path) as file:
+            if path.endswith(('.yml', '.yaml')):
+                if yaml is None:
+                    raise BatchError('Install the python module PyYAML to use YAML plans, or write the plan as JSON')
+                plan = yaml.safe_load(file)
+            else:
+                plan = json.load(file)
+    except OSError as error:
+        raise BatchError(f"Could not read the plan: {error}")
+    except ValueError as error:
+        raise BatchError(f"Could not parse the plan: {error}")
+
+    if not isinstance(plan, dict) or not isinstance(plan.get('steps'), list):
+        raise BatchError('The plan needs a list of steps')
+    for step in plan['steps']:
+        if not isinstance(step, dict) or 'command' not in step:
+            raise BatchError(f"Every step needs a command: {step}")
+    return plan
+
+def resolve(names, name, kind) -> str:
+    '''
+    Resolves a command or an action by its name, its name without
+    the last word (update for update_plugin) or a unique prefix
+
+    Parameters:
+        names (list): the known names
+        name (str): the requested name
+        kind (str): 'command' or 'action', for the error message
+
+    Returns:
+        str: the name
+    '''
+    name = str(name).lower().replace('-', '_')
+    if name in names:
+        return name
+    matches = [known for known in names if known.split('_')[:-1] == name.split('_')]
+    if len(matches) == 1:
+        return matches[0]
+    matches = [known for known in names if known.startswith(name)]
+    if len(matches) == 1:
+        return matches[0]
+    if len(matches) == 0:
+        raise BatchError(f"Unknown {kind} '{name}', possible: {', '.join(names)}")
+    raise BatchError(f"Ambiguous {kind} '{name}', possible: {', '.join(matches)}")
+
+def run_plan(lazywp, plan) -> list:
+    '''
+    Runs the steps of a plan on every path. The steps of a path stop
+    at the first failed step.
+
+    Parameters:
+        lazywp (obj): the headless lazywp object
+        plan (dict): the plan
+
+    Returns:
+        list: the results by path
+    '''
+    start = os.getcwd()
+    results = []
+    try:
+        for path in plan.get('paths') or [start]:
+            result = {'path': path, 'ok': False, 'steps': []}
+            results.append(result)
+            try:
+                os.chdir(os.path.join(start, path))
+            except OSError as error:
+                result['error'] = str(error)
+                continue
+
+            # nothing is shared between installations
+            lazywp.command_holder = {}
+            lazywp.wp_call = None
+            lazywp.bootstrap.reset()
+            returncode, output = lazywp.wp_run('core is-installed')
+            if returncode != 0:
+                result['error'] = 'Could not detect WordPress'
+                continue
+
+            for step in plan['steps']:
+                step_result = run_step(lazywp, step, plan.get('yes', False))
+                result['steps'].append(step_result)
+                if step_result['ok'] == False:
+                    break
+            result['ok'] = all(step_result['ok'] for step_result in result['steps']) and len(result['steps']) == len(plan['steps'])
+    finally:
+        os.chdir(start)
+    return results
+
+def run_step(lazywp, step, yes=False) -> dict:
+    '''
+    Runs a single step like the user would in the TUI: the command
+    is entered, the items are selected and the action is called. The
+    'list' action returns the entries of the command.
+
+    Parameters:
+        lazywp (obj): the headless lazywp object
+        step (dict): the step
+        yes (bool): the default answer to confirmations
+
+    Returns:
+        dict: the result of the step
+    '''
+    items = step.get('items', [])
+    if not isinstance(items, list):
+        items = [items]
+    result = {'command': step['command'], 'action': step.get('action', 'list'), 'ok': False}
+    if items:
+        result['items'] = items
+
+    try:
+        command = resolve(list(lazywp.commands_modules), step['command'], 'command')
+        module = lazywp.commands_modules[command]
+        action = resolve([action[1] for action in module.config()['actions']] + ['list'], result['action'], 'action')
+    except BatchError as error:
+        result['error'] = str(error)
+        return result
+    result['command'] = command
+    result['action'] = action
+    lazywp.batch.reset(step.get('yes', yes), step.get('inputs', []))
+
+    # enter the command like the menu does
+    lazywp.active_command = command
+    lazywp.cursor_position = 0
+    lazywp.content_pad_pos = 0
+    lazywp.has_header = False
+    if hasattr(module, 'activate'):
+        module.activate(lazywp)
+    lazywp.content = module.get_content(lazywp)
+
+    view = getattr(module, 'view', None)
+    if items or step.get('all') == True:
+        if view is None:
+            result['error'] = f"{command} has no entries to select"
+            return result
+        if step.get('all') == True:
+            items = [row[0] for row in view.rows]
+            if len(items) == 0:
+                result['error'] = f"{command} has no entries"
+                return result
+        if view.selectable == False and len(items) > 1:
+            result['error'] = f"{command} can only run on one entry at a time"
+            return result
+        missing = view.select(lazywp, items)
+        if len(missing) != 0:
+            result['error'] = f"Not found: {', '.join(str(item) for item in missing)}"
+            return result
+        lazywp.content = module.get_content(lazywp)
+
+    if action == 'list':
+        if view is not None:
+            result['rows'] = view.listed()
+        else:
+            result['content'] = [line[0] for line in lazywp.content]
+    else:
+        getattr(module, action)(lazywp, lazywp.command_holder)
+
+        # a report of the action, unless the view only has to be reloaded
+        if view is None or view.rows is not None:
+            content = module.get_content(lazywp)
+            if view is None or content is not view.content:
+                result['content'] = [line[0] for line in content]
+
+    result['messages'] = lazywp.batch.messages
+    result['wp'] = lazywp.batch.calls
+    result['ok'] = all(call['returncode'] == 0 or call.get('optional') == True for call in lazywp.batch.calls)
+    return result
+
+def format_text(results) -> str:
+    '''
+    Formats the results for the terminal. Entries are tab separated
+    with a header line, so they can be piped into other tools.
+
+    Parameters:
+        results (list): the results by path
+
+    Returns:
+        str: the text
+    '''
+    lines = []
+    for result in results:
+        if len(results) > 1:
+            lines.append(f"# {result['path']}: {'ok' if result['ok'] == True else 'failed'}")
+        if 'error' in result:
+            lines.append(f"Error: {result['error']}")
+        for step in result['steps']:
+            if len(result['steps']) > 1:
+                lines.append(f"## {step['command']} {step['action']}: {'ok' if step['ok'] == True else 'failed'}")
+            if 'error' in step:
+                lines.append(f"Error: {step['error']}")
+            for messages in step.get('messages', []):
+                lines += messages
+            rows = step.get('rows', [])
+            if len(rows) != 0:
+                lines.append("\t".join(rows[0].keys()))
+                for row in rows:
+                    lines.append("\t".join(str(value) for value in row.values()))
+            lines += step.get('content', [])
+            for call in step.get('wp', []):
+                if call['returncode'] != 0 and call.get('optional') != True:
+                    lines.append(f"Error: wp {call['command']} ({call['returncode']}): {call['output']}")
+    return "\n".join(lines)
@@ -0,0 +1,351 @@
+#!/usr/bin/python3
+
+import os, re, json, time, hashlib, threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config import STATE_PATH, BOOTSTRAP_CHECK_TTL
+
+'''
+Read-only commands and the parts of the bootstrap they don't need.
+Everything else, especially every command which changes something,
+always gets the full bootstrap.
+'''
+PROFILES = [
+    ['plugin list', '--skip-themes --skip-packages'],
+    ['theme list', '--skip-plugins --skip-packages'],
+    ['option get', '--skip-plugins --skip-themes --skip-packages'],
+    ['option list', '--skip-plugins --skip-themes --skip-packages'],
+    ['site list', '--skip-plugins --skip-themes --skip-packages'],
+    ['db size', '--skip-plugins --skip-themes --skip-packages'],
+    ['db tables', '--skip-plugins --skip-themes --skip-packages'],
+    ['cron event list', '--skip-themes --skip-packages'],
+    ['core version', '--skip-plugins --skip-themes --skip-packages'],
+    ['core is-installed', '--skip-plugins --skip-themes --skip-packages']
+]
+
+'''
+Subcommands which only read, running them keeps the checks. Nested
+subcommands like `cron event list` are found behind their group.
+'''
+READ_ONLY = {'get', 'list', 'size', 'tables', 'export', 'is-installed', 'version', 'verify-checksums', 'path', 'status', 'exists'}
+GROUPS = {'event', 'schedule', 'auto-updates', 'meta', 'option', 'term', 'session'}
+
+# evals which only echo constants, like the one finding the log file
+ECHO_EVAL = re.compile(r"^eval '(\s*echo [^;']+;)+\s*'$")
+
+# subsites of a network share their checks
+URL_OPTION = re.compile(r" --url=('[^']*'|\S+)")
+
+# the oldest checks are dropped beyond this
+MAX_CHECKS = 100
+
+class BootstrapProfiles:
+    '''
+    Adds --skip-plugins, --skip-themes and --skip-packages to read-only
+    commands which don't need them. Plugins may change the output of
+    any command through filters, so every command line is checked on
+    its own: the first time it runs with and without the skip flags
+    in parallel, the flags are only used if both outputs are the same.
+    The --url of a subsite isn't part of the check, so a fan out over
+    the subsites of a network is only checked on the first subsite.
+
+    The checks are saved per WordPress installation under STATE_PATH
+    and expire after BOOTSTRAP_CHECK_TTL seconds. Any command which
+    may change something drops the checks of the installation.
+
+    Attributes:
+        enabled (bool): whether the profiles are used
+        log (obj): the logger
+        install (str): the directory of the installation the checks belong to
+        checks (dict): the checks by command line, with their state and timings
+        verifying (set): the command lines which are being checked right now
+        saved (float): the estimated seconds saved in this session
+        lock (obj): guards the checks, commands run in worker threads
+
+    Methods:
+        match(): returns the profile of a command
+        key(): returns the command line a check is stored by
+        check(): returns the check of a command
+        pending(): checks if a command still needs to be checked
+        apply(): adds the skip flags of a checked command
+        run(): runs a command with its profile
+        verify(): runs a command with and without its profile and compares them
+        observe(): drops the checks if a command may change something
+        read_only(): checks if a command only reads
+        account(): logs the time saved by a profile
+        reset(): loads the checks of the current installation
+        state_file(): returns the path of the saved checks
+        save(): saves the checks
+    '''
+    enabled = True
+    log = None
+    install = None
+    checks = None
+    verifying = None
+    saved = 0
+    lock = None
+
+    def __init__(self, enabled, log):
+        self.enabled = enabled
+        self.log = log
+        self.verifying = set()
+        self.lock = threading.Lock()
+
+    def match(self, command):
+        '''
+        Returns the profile of a command
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            list: the prefix and the skip flags, None if there is no profile
+        '''
+        if self.enabled == False:
+            return None
+        for prefix, flags in PROFILES:
+            if command == prefix or command.startswith(prefix + ' '):
+                return [prefix, flags]
+        return None
+
+    def key(self, command) -> str:
+        '''
+        Returns the command line a check is stored by, the command
+        without --url
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            str: the key
+        '''
+        return URL_OPTION.sub('', command)
+
+    def check(self, command):
+        '''
+        Returns the unexpired check of a command in the current
+        installation
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            dict: the check, None if it hasn't been checked
+        '''
+        if self.install != os.getcwd():
+            self.reset()
+        check = self.checks.get(self.key(command))
+        if check is None or time.time() - check['checked'] > BOOTSTRAP_CHECK_TTL:
+            return None
+        return check
+
+    def pending(self, command) -> bool:
+        '''
+        Checks if a command with a profile still needs to be checked
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            bool: true if the command hasn't been checked yet
+        '''
+        return self.match(command) is not None and self.check(command) is None
+
+    def apply(self, command) -> str:
+        '''
+        Adds the skip flags to a command if it has been checked
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            str: the command to run
+        '''
+        profile = self.match(command)
+        if profile is None:
+            return command
+        check = self.check(command)
+        if check is None or check['state'] != 'verified':
+            return command
+        return f"{command} {profile[1]}"
+
+    def run(self, command, execute) -> tuple:
+        '''
+        Runs a command with its profile. A command which hasn't been
+        checked is checked now, while it's being checked by another
+        thread or if the check failed the full bootstrap is used.
+
+        Parameters:
+            command (str): the wp command
+            execute (callable): runs a wp command and returns the returncode and the output
+
+        Returns:
+            tuple: the returncode and the output
+        '''
+        profile = self.match(command)
+        if profile is None:
+            self.observe(command)
+            return execute(command)
+
+        with self.lock:
+            check = self.check(command)
+            verify = check is None and self.key(command) not in self.verifying
+            if verify == True:
+                self.verifying.add(self.key(command))
+        if verify == True:
+            return self.verify(command, profile[1], execute)
+        if check is None or check['state'] != 'verified':
+            return execute(command)
+
+        started = time.monotonic()
+        result = execute(f"{command} {profile[1]}")
+        self.account(command, time.monotonic() - started)
+        return result
+
+    def verify(self, command, flags, execute) -> tuple:
+        '''
+        Runs a command with and without the skip flags in parallel
+        and compares the results. The result of the full bootstrap
+        is returned in any case.
+
+        Parameters:
+            command (str): the wp command
+            flags (str): the skip flags
+            execute (callable): runs a wp command and returns the returncode and the output
+
+        Returns:
+            tuple: the returncode and the output
+        '''
+        def timed(line):
+            started = time.monotonic()
+            return execute(line), time.monotonic() - started
+
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                skipped = pool.submit(timed, f"{command} {flags}")
+                full_result, full_seconds = timed(command)
+                skipped_result, skipped_seconds = skipped.result()
+        finally:
+            with self.lock:
+                self.verifying.discard(self.key(command))
+
+        with self.lock:
+            self.checks[self.key(command)] = {
+                'state': 'verified' if skipped_result == full_result else 'failed',
+                'full': full_seconds,
+                'skipped': skipped_seconds,
+                'checked': time.time()
+            }
+            if len(self.checks) > MAX_CHECKS:
+                oldest = min(self.checks, key=lambda key: self.checks[key]['checked'])
+                del self.checks[oldest]
+            self.save()
+
+        if skipped_result == full_result:
+            self.log.info(f"Bootstrap profile verified for {command} with {flags}: {full_seconds:.2f}s full, {skipped_seconds:.2f}s skipped")
+        else:
+            self.log.info(f"Bootstrap profile disabled for {command}, the output differs from the full bootstrap with {flags}")
+        return full_result
+
+    def observe(self, command) -> None:
+        '''
+        Drops the checks of the installation if a command may change
+        something, like the active plugins or filtered options
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            void
+        '''
+        if self.enabled == False or self.match(command) is not None or self.read_only(command):
+            return
+        with self.lock:
+            if self.install != os.getcwd():
+                self.reset()
+            if len(self.checks) == 0:
+                return
+            self.checks = {}
+            self.save()
+        self.log.debug(f"Bootstrap checks dropped, {command} may change the installation")
+
+    def read_only(self, command) -> bool:
+        '''
+        Checks if a command only reads, like `config get` or a dry run
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            bool: true if the command doesn't change anything
+        '''
+        if '--dry-run' in command.split() or ECHO_EVAL.match(command):
+            return True
+        words = command.split()
+        if len(words) > 1 and words[1] in READ_ONLY:
+            return True
+        return len(words) > 2 and words[1] in GROUPS and words[2] in READ_ONLY
+
+    def account(self, command, seconds) -> None:
+        '''
+        Logs the time a profile saved, estimated by the timings of
+        the check
+
+        Parameters:
+            command (str): the wp command
+            seconds (float): the seconds the command took with the profile
+
+        Returns:
+            void
+        '''
+        profile = self.match(command)
+        check = self.check(command) if profile is not None else None
+        if check is None or check['state'] != 'verified':
+            return
+        saved = max(check['full'] - check['skipped'], 0)
+        with self.lock:
+            self.saved += saved
+        self.log.debug(f"Command {command} took {seconds:.2f}s with {profile[1]}, about {saved:.2f}s saved ({self.saved:.1f}s this session)")
+
+    def reset(self) -> None:
+        '''
+        Loads the saved checks of the installation in the current
+        directory
+
+        Returns:
+            void
+        '''
+        self.install = os.getcwd()
+        self.checks = {}
+        try:
+            with open(self.state_file()) as file:
+                self.checks = json.load(file)
+        except (OSError, ValueError):
+            pass
+
+    def state_file(self) -> str:
+        '''
+        Returns the path of the saved checks of the installation
+
+        Returns:
+            str: the path
+        '''
+        directory = os.path.expanduser(STATE_PATH)
+        site = hashlib.sha1(self.install.encode('utf-8')).hexdigest()[:12]
+        return f"{directory}/bootstrap-{site}.json"
+
+    def save(self) -> None:
+        '''
+        Saves the checks of the installation, a failure only costs
+        the checks of the next session
+
+        Returns:
+            void
+        '''
+        try:
+            os.makedirs(os.path.expanduser(STATE_PATH), exist_ok=True)
+            temporary = f"{self.state_file()}.tmp"
+            with open(temporary, 'w') as file:
+                json.dump(self.checks, file)
+            os.replace(temporary, self.state_file())
+        except OSError as error:
+            self.log.warning(f"Could not save the bootstrap checks: {error}")
@@ -0,0 +1,354 @@
+#!/usr/bin/python3
+
+import time, shlex
+from bisect import bisect_left, bisect_right, insort
+from src.config import CRON_OVERDUE_AFTER
+from src.listview import ListView, HOVER_COLORS
+
+GROUP_COLUMNS = [
+    ['Hook', 0],
+    ['Events', 8],
+    ['Overdue', 8],
+    ['Next run (GMT)', 20]
+]
+
+class CronIndex:
+    '''
+    Indexes the cron events by their next run and by their hook. The
+    index is patched with the events which changed since the last
+    load instead of being built again.
+
+    Attributes:
+        records (set): the indexed events
+        times (list): the run times of all events, sorted
+        hooks (dict): the sorted run times of the events by hook
+        rows (list): the entries of the view the index has been built for
+
+    Methods:
+        patch(): patches the index with the entries of the view
+        overdue(): returns the amount of overdue events
+        groups(): returns the events grouped by hook
+    '''
+    records = None
+    times = None
+    hooks = None
+    rows = None
+
+    def __init__(self):
+        self.records = set()
+        self.times = []
+        self.hooks = {}
+
+    def patch(self, rows) -> tuple:
+        '''
+        Patches the index with the events which have been added or
+        removed since the last load
+
+        Parameters:
+            rows (list): the entries of the view
+
+        Returns:
+            tuple: the amount of added and removed events
+        '''
+        records = set(rows)
+        added = records - self.records
+        removed = self.records - records
+        for record in removed:
+            del self.times[bisect_left(self.times, record.time)]
+            times = self.hooks[record.hook]
+            del times[bisect_left(times, record.time)]
+            if len(times) == 0:
+                del self.hooks[record.hook]
+        for record in added:
+            insort(self.times, record.time)
+            insort(self.hooks.setdefault(record.hook, []), record.time)
+        self.records = records
+        self.rows = rows
+        return len(added), len(removed)
+
+    def overdue(self, now) -> int:
+        '''
+        Returns the amount of overdue events
+
+        Parameters:
+            now (float): the current time
+
+        Returns:
+            int: the amount of events due before now minus the grace time
+        '''
+        return bisect_right(self.times, now - CRON_OVERDUE_AFTER)
+
+    def groups(self, now) -> list:
+        '''
+        Returns the events grouped by hook, the hook running next first
+
+        Parameters:
+            now (float): the current time
+
+        Returns:
+            list: the groups as [hook, events, overdue, next run]
+        '''
+        groups = []
+        for hook, times in self.hooks.items():
+            overdue = bisect_right(times, now - CRON_OVERDUE_AFTER)
+            groups.append([hook, len(times), overdue, times[0]])
+        groups.sort(key=lambda group: group[3])
+        return groups
+
+def is_overdue(record) -> bool:
+    '''
+    Checks if an event should have run already
+
+    Parameters:
+        record (Record): the event
+
+    Returns:
+        bool: true if the event is overdue
+    '''
+    return isinstance(record.time, int) and record.time < time.time() - CRON_OVERDUE_AFTER
+
+def row_color(record) -> str:
+    '''
+    Overdue events are highlighted
+
+    Parameters:
+        record (Record): the event
+
+    Returns:
+        str: the color
+    '''
+    if is_overdue(record):
+        return 'entry_active'
+    return 'entry_default'
+
+# the relative next run changes every second and is left out, so
+# unchanged events stay the same and don't need to be rendered again
+view = ListView(
+    label='Cron',
+    command='cron event list --fields=hook,next_run_gmt,recurrence,time,sig --format=json',
+    columns=[
+        ['Hook', 'hook', 0],
+        ['Next run (GMT)', 'next_run_gmt', 20],
+        ['Recurrence', 'recurrence', 20]
+    ],
+    key='hook',
+    holder='active_event',
+    style=row_color,
+    actions=[
+        ['r', 'run_events', 'Run the events of the selected hooks now'],
+        ['d', 'run_due', 'Run all due events now'],
+        ['g', 'toggle_groups', 'Group the events by hook']
+    ],
+    statusbar=[
+        'r: run',
+        'd: run due',
+        'g: group'
+    ],
+    empty='No cron events found.',
+    fields=['time', 'sig'],
+    selectable=True
+)
+
+index = CronIndex()
+
+config = view.config
+activate = view.activate
+refresh_rows = view.refresh_rows
+select_all = view.select_all
+
+def get_content(lazywp) -> list:
+    '''
+    Builds the content, either the events or the events grouped by
+    hook. The index is patched whenever the events have been loaded.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    returns:
+        list: the content to be drawn
+    '''
+    data = lazywp.command_holder
+    content = view.get_content(lazywp)
+    if view.rows is not index.rows:
+        added, removed = index.patch(view.rows)
+        lazywp.log.debug(f"Cron index patched: {added} added, {removed} removed, {len(index.records)} events")
+    if data.get('cron_grouped') != True or len(view.rows) == 0:
+        return content
+
+    now = time.time()
+    groups = index.groups(now)
+    lazywp.cursor_position = min(lazywp.cursor_position, len(groups) - 1)
+    content = []
+    content.append([lazywp.tui.draw_table_row([[column[0], column[1]] for column in GROUP_COLUMNS], lazywp)])
+    content.append([lazywp.tui.draw_table_row([['-' * lazywp.cols, column[1]] for column in GROUP_COLUMNS], lazywp)])
+    for position, group in enumerate(groups):
+        cells = [
+            [group[0], 0],
+            [group[1], 8],
+            [group[2] or '', 8],
+            [time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(group[3])), 20]
+        ]
+        color = 'entry_active' if group[2] > 0 else 'entry_default'
+        if group[0] in view.selection:
+            color = 'entry_selected'
+        if position == lazywp.cursor_position:
+            color = HOVER_COLORS.get(color, color)
+        content.append([lazywp.tui.draw_table_row(cells, lazywp), color])
+
+    content.append([" "])
+    content.append([f"{len(index.records)} events in {len(groups)} hooks, {index.overdue(now)} overdue"])
+    return content
+
+def cursor_hook(lazywp, data) -> str:
+    '''
+    Returns the hook under the cursor
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        str: the hook, None if there is none
+    '''
+    if data.get('cron_grouped') == True:
+        groups = index.groups(time.time())
+        if len(groups) == 0:
+            return None
+        return groups[min(lazywp.cursor_position, len(groups) - 1)][0]
+    event = data.get('active_event')
+    return event['hook'] if event is not None else None
+
+def toggle_selection(lazywp, data):
+    '''
+    Selects or deselects the hook under the cursor
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if data.get('cron_grouped') != True:
+        view.toggle_selection(lazywp, data)
+        return
+    hook = cursor_hook(lazywp, data)
+    if hook is None:
+        return
+    view.selection ^= {hook}
+    view.content = None
+    lazywp.cursor_position = min(lazywp.cursor_position + 1, len(index.hooks) - 1)
+    lazywp.reload_content = True
+
+def sort_rows(lazywp, data):
+    '''
+    Sorts the events, the groups are always sorted by their next run
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if data.get('cron_grouped') != True:
+        view.sort_rows(lazywp, data)
+
+def filter_rows(lazywp, data):
+    '''
+    Filters the events, the groups are never filtered
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if data.get('cron_grouped') != True:
+        view.filter_rows(lazywp, data)
+
+def toggle_groups(lazywp, data):
+    '''
+    Switches between the events and the events grouped by hook
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    data['cron_grouped'] = data.get('cron_grouped') != True
+    lazywp.cursor_position = 0
+    lazywp.content_pad_pos = 0
+
+    # the events have to draw their highlight again
+    view.content = None
+    lazywp.reload_content = True
+
+def run_events(lazywp, data):
+    '''
+    Runs the events of the selected hooks, or of the hook under the
+    cursor, in a single `wp cron event run`
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    hooks = sorted(view.selection)
+    if len(hooks) == 0:
+        hook = cursor_hook(lazywp, data)
+        if hook is None:
+            return
+        hooks = [hook]
+    events = sum(len(index.hooks.get(hook, [])) for hook in hooks)
+    if lazywp.askbox([f"Run {events} events of {len(hooks)} hooks now?"]) != True:
+        return
+    lazywp.msgbox([f"Running {events} events"])
+    lazywp.wp(f"cron event run {' '.join(shlex.quote(hook) for hook in hooks)}", False)
+    show_result(lazywp)
+    view.selection = set()
+
+def run_due(lazywp, data):
+    '''
+    Runs all due events in a single `wp cron event run`
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    due = bisect_right(index.times, time.time())
+    if due == 0:
+        lazywp.msgbox(["No events are due."])
+        return
+    if lazywp.askbox([f"Run {due} due events now?"]) != True:
+        return
+    lazywp.msgbox([f"Running {due} due events"])
+    lazywp.wp("cron event run --due-now", False)
+    show_result(lazywp)
+
+def show_result(lazywp):
+    '''
+    Shows the result of a run and reloads the events, only the
+    changed events are rendered and indexed again
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    Returns:
+        void
+    '''
+    lines = lazywp.wp_output.strip().splitlines()
+    view.invalidate()
+    lazywp.reload_content = True
+    if lazywp.wp_returncode != 0:
+        lazywp.msgbox(["Running the events failed:"] + lines[-3:])
+        return
+    lazywp.msgbox(lines[-1:] or ["Done"])
@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+
+import os, time, secrets, tempfile, subprocess
+from datetime import date
+from src.listview import ListView
+from src.compression import compressor, decompressor, EXTENSIONS
+
+CHUNK_SIZE = 1048576
+PROGRESS_INTERVAL = 0.2
+TABLE_MARKER = b'CREATE TABLE '
+
+view = ListView(
+    label='Database',
+    command='db size --tables --format=json',
+    columns=[
+        ['Table', 'Name', 0],
+        ['Size', 'Size', 14]
+    ],
+    key='Name',
+    holder='active_table',
+    actions=[
+        ['e', 'export_database', 'Export the database into a (compressed) file'],
+        ['i', 'import_database', 'Import a (compressed) file into the database']
+    ],
+    statusbar=[
+        'e: export',
+        'i: import'
+    ],
+    empty='No tables found.'
+)
+
+config = view.config
+get_content = view.get_content
+activate = view.activate
+sort_rows = view.sort_rows
+filter_rows = view.filter_rows
+refresh_rows = view.refresh_rows
+
+def export_database(lazywp, data):
+    '''
+    Streams `wp db export -` through a compressor straight into the
+    target file. The compression is chosen by the extension of the
+    file (.gz, .bz2, .xz, .zst), memory usage is constant. The dump
+    is written next to the file and only replaces it when the export
+    succeeded.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    # the default name ends with a random hash like the one of wpcli, the
+    # current directory usually is the web root and the dump must not be guessable
+    returncode, output = lazywp.wp_run("config get DB_NAME", True)
+    name = output.strip() if returncode == 0 else ''
+    default_path = f"{name or 'database'}-{date.today().isoformat()}-{secrets.token_hex(4)}.sql.gz"
+    path = lazywp.slinputbox([f"Export to file, leave empty for {default_path}", f"Compression by extension: {', '.join(EXTENSIONS)}"]).strip()
+    if path == '':
+        path = default_path
+    if os.path.exists(path) and lazywp.askbox([f"{path} already exists, overwrite it?"]) != True:
+        return
+    partial = f"{path}.part"
+
+    tables = len(view.rows or [])
+    started = time.monotonic()
+    shown = 0
+    dumped = 0
+    dumped_tables = 0
+    tail = b''
+
+    with tempfile.TemporaryFile() as errors:
+        call = lazywp.wp_popen("db export -", stdout=subprocess.PIPE, stderr=errors)
+        try:
+            with open(partial, 'wb') as raw:
+                target = compressor(raw, path)
+                chunk = call.stdout.read1(CHUNK_SIZE)
+                while chunk:
+                    target.write(chunk)
+                    dumped += len(chunk)
+
+                    # count the tables, the marker may be split between chunks
+                    dumped_tables += (tail + chunk).count(TABLE_MARKER)
+                    tail = chunk[-len(TABLE_MARKER)+1:]
+
+                    if time.monotonic() - shown > PROGRESS_INTERVAL:
+                        show_progress(lazywp, f"Exporting database to {path}", raw.tell(), dumped, dumped_tables, tables, started)
+                        shown = time.monotonic()
+                    chunk = call.stdout.read1(CHUNK_SIZE)
+                target.close()
+        except (OSError, RuntimeError) as error:
+            call.kill()
+            call.wait()
+            if os.path.exists(partial):
+                os.remove(partial)
+            lazywp.wp_popen_done("db export -", call.returncode, str(error))
+            lazywp.msgbox([f"Export failed: {error}"])
+            return
+        call.wait()
+        errors.seek(0)
+        error_output = errors.read().decode('utf-8', 'replace')
+    lazywp.wp_popen_done("db export -", call.returncode, error_output)
+
+    if call.returncode != 0:
+        os.remove(partial)
+        lazywp.msgbox(["Export failed:"] + error_output.strip().splitlines()[:5])
+        return
+
+    os.replace(partial, path)
+    size = lazywp.tui.format_size(os.path.getsize(path))
+    lazywp.msgbox([f"Exported {dumped_tables} tables to {path}", f"{size} written ({lazywp.tui.format_size(dumped)} uncompressed) in {time.monotonic() - started:.1f}s"])
+
+def import_database(lazywp, data):
+    '''
+    Streams a (compressed) dump through the decompressor into
+    `wp db import -`. Memory usage is constant.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    path = lazywp.slinputbox(["Import from file", f"Compression by extension: {', '.join(EXTENSIONS)}"]).strip()
+    if path == '':
+        return
+    if not os.path.isfile(path):
+        lazywp.msgbox([f"File {path} not found"])
+        return
+    if lazywp.askbox([f"Import {path}?", "This overwrites the tables in the dump."]) != True:
+        return
+
+    size = os.path.getsize(path)
+    started = time.monotonic()
+    shown = 0
+    imported = 0
+    imported_tables = 0
+    tail = b''
+
+    with tempfile.TemporaryFile() as output:
+        call = lazywp.wp_popen("db import -", stdin=subprocess.PIPE, stdout=output, stderr=subprocess.STDOUT)
+        try:
+            with open(path, 'rb') as raw:
+                source = decompressor(raw, path)
+                chunk = source.read(CHUNK_SIZE)
+                while chunk:
+                    call.stdin.write(chunk)
+                    imported += len(chunk)
+                    imported_tables += (tail + chunk).count(TABLE_MARKER)
+                    tail = chunk[-len(TABLE_MARKER)+1:]
+
+                    if time.monotonic() - shown > PROGRESS_INTERVAL:
+                        percent = raw.tell() * 100 // max(size, 1)
+                        show_progress(lazywp, f"Importing {path} ({percent}%)", raw.tell(), imported, imported_tables, 0, started)
+                        shown = time.monotonic()
+                    chunk = source.read(CHUNK_SIZE)
+                source.close()
+            call.stdin.close()
+        except BrokenPipeError:
+            # wpcli stopped reading, its output tells why
+            pass
+        except (OSError, EOFError, RuntimeError) as error:
+            call.kill()
+            call.wait()
+            lazywp.wp_popen_done("db import -", call.returncode, str(error))
+            lazywp.msgbox([f"Import failed: {error}"])
+            return
+        call.wait()
+        output.seek(0)
+        result = output.read().decode('utf-8', 'replace')
+    lazywp.wp_popen_done("db import -", call.returncode, result)
+
+    view.invalidate()
+    lazywp.reload_content = True
+    if call.returncode != 0:
+        lazywp.msgbox(["Import failed:"] + result.strip().splitlines()[:5])
+        return
+    lazywp.msgbox([f"Imported {imported_tables} tables from {path}", f"{lazywp.tui.format_size(imported)} in {time.monotonic() - started:.1f}s"])
+
+def show_progress(lazywp, title, file_bytes, dump_bytes, tables, total_tables, started):
+    '''
+    Displays the progress of an export or import
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        title (str): what is going on
+        file_bytes (int): the bytes of the (compressed) file
+        dump_bytes (int): the bytes of the uncompressed dump
+        tables (int): the amount of tables done
+        total_tables (int): the amount of tables, 0 if unknown
+        started (float): the start time
+
+    Returns:
+        void
+    '''
+    elapsed = time.monotonic() - started
+    table_progress = f"{tables}/{total_tables}" if total_tables else f"{tables}"
+    lazywp.msgbox([
+        title,
+        f"File: {lazywp.tui.format_size(file_bytes)} | Dump: {lazywp.tui.format_size(dump_bytes)}",
+        f"Tables: {table_progress} | {lazywp.tui.format_size(dump_bytes / max(elapsed, 0.001))}/s | {elapsed:.0f}s"
+    ])
@@ -0,0 +1,292 @@
+#!/usr/bin/python3
+
+import re
+from collections import deque
+from src.config import LOGS_MAX_LINES
+from src.logtail import LogTail
+
+LEVELS = [
+    ['all', None],
+    ['error', re.compile(r'PHP (Fatal|Parse|Recoverable fatal|Catchable fatal) error')],
+    ['warning', re.compile(r'PHP Warning')],
+    ['notice', re.compile(r'PHP Notice')],
+    ['deprecated', re.compile(r'PHP Deprecated')]
+]
+
+LEVEL_COLORS = {
+    'error': 'log_error',
+    'warning': 'log_warning'
+}
+
+def config():
+    return {
+        'label': 'Logs',
+        'menu': 'Logs',
+        'actions': [
+            ['f', 'toggle_follow', 'Toggle following the log'],
+            ['l', 'cycle_level', 'Filter by the next log level'],
+            ['/', 'filter_pattern', 'Filter by a regular expression'],
+            ['c', 'clear_filter', 'Clear all filters'],
+            ['o', 'open_log', 'Open another log file']
+        ],
+        'statusbar': [
+            'f: follow',
+            'l: level',
+            '/: filter',
+            'c: clear',
+            'o: open'
+        ]
+    }
+
+def get_content(lazywp) -> list:
+    '''
+    Builds the content for the logs view
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    returns:
+        list: the content to be drawn
+    '''
+    data = lazywp.command_holder
+    lazywp.has_header = False
+    if 'logs_tail' not in data:
+        open_tail(lazywp, find_log_path(lazywp))
+    tail = data['logs_tail']
+
+    # build the info line
+    level = LEVELS[data['logs_level']][0]
+    follow = 'on' if data['logs_follow'] == True else 'off'
+    info = f"{tail.path} | level: {level} | filter: {data['logs_pattern'] or '-'} | follow: {follow}"
+
+    width = lazywp.cols - 27
+    content = [[info[:width], 'entry_active'], [' ']]
+    if len(data['logs_lines']) == 0:
+        content.append(['No matching log entries found.'])
+
+    for line, color in data['logs_lines']:
+        content.append([line.expandtabs(4).replace('\0', '')[:width], color])
+
+    # stick to the end of the log
+    if data['logs_follow'] == True:
+        lazywp.content_pad_pos = max(len(content) - lazywp.rows + 5, 0)
+
+    return content
+
+def tick(lazywp, data) -> bool:
+    '''
+    Polls the log for appended lines
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        bool: true if the content needs to be redrawn
+    '''
+    if 'logs_tail' not in data:
+        return False
+    tail = data['logs_tail']
+    lines = lazywp.read_lines(tail.path, tail.poll)
+    if len(lines) == 0:
+        return False
+    add_lines(data, lines)
+    return True
+
+def find_log_path(lazywp) -> str:
+    '''
+    Finds the path of the debug.log. WP_DEBUG_LOG may hold a custom
+    path, otherwise WordPress logs to wp-content/debug.log.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    Returns:
+        str: the path of the log file
+    '''
+    lazywp.wp("config get WP_DEBUG_LOG")
+    path = lazywp.wp_output.strip()
+    if lazywp.wp_returncode == 0 and path not in ['', '0', '1', 'true', 'false']:
+        return path
+
+    lazywp.wp("eval 'echo WP_CONTENT_DIR;'")
+    if lazywp.wp_returncode == 0:
+        return lazywp.wp_output.strip() + '/debug.log'
+    return 'wp-content/debug.log'
+
+def open_tail(lazywp, path):
+    '''
+    Opens a log file and resets the filters
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        path (str): the path of the log file
+
+    Returns:
+        void
+    '''
+    data = lazywp.command_holder
+    tail = LogTail(path, LOGS_MAX_LINES)
+    data['logs_tail'] = tail
+    data['logs_entries'] = deque(maxlen=LOGS_MAX_LINES)
+    data['logs_lines'] = deque(maxlen=LOGS_MAX_LINES)
+    data['logs_level'] = 0
+    data['logs_pattern'] = ''
+    data['logs_regex'] = None
+    data['logs_follow'] = True
+    add_lines(data, lazywp.read_lines(path, tail.open))
+
+def add_lines(data, lines):
+    '''
+    Colors new lines by their level and filters them. Only the new
+    lines are checked, the already filtered lines are kept.
+
+    Parameters:
+        data (dict): the transfer data dict
+        lines (list): the new lines
+
+    Returns:
+        void
+    '''
+    for line in lines:
+        entry = [line, line_color(line)]
+        data['logs_entries'].append(entry)
+        if matches(data, line):
+            data['logs_lines'].append(entry)
+
+def line_color(line) -> str:
+    '''
+    Determines the color of a line by its log level
+
+    Parameters:
+        line (str): the log line
+
+    Returns:
+        str: the color
+    '''
+    for level, regex in LEVELS[1:]:
+        if level in LEVEL_COLORS and regex.search(line):
+            return LEVEL_COLORS[level]
+    return 'default'
+
+def matches(data, line) -> bool:
+    '''
+    Checks a line against the active level and pattern filter
+
+    Parameters:
+        data (dict): the transfer data dict
+        line (str): the log line
+
+    Returns:
+        bool: true if the line passes the filters
+    '''
+    level_regex = LEVELS[data['logs_level']][1]
+    if level_regex is not None and not level_regex.search(line):
+        return False
+    if data['logs_regex'] is not None and not data['logs_regex'].search(line):
+        return False
+    return True
+
+def refilter(lazywp, data):
+    '''
+    Filters the kept lines again after a filter has been changed
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    data['logs_lines'].clear()
+    for entry in data['logs_entries']:
+        if matches(data, entry[0]):
+            data['logs_lines'].append(entry)
+    lazywp.content_pad_pos = 0
+    lazywp.cursor_position = 0
+    lazywp.reload_content = True
+
+def toggle_follow(lazywp, data):
+    '''
+    Toggles following the end of the log
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    data['logs_follow'] = not data['logs_follow']
+    lazywp.reload_content = True
+
+def cycle_level(lazywp, data):
+    '''
+    Switches the level filter to the next level
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    data['logs_level'] = (data['logs_level'] + 1) % len(LEVELS)
+    refilter(lazywp, data)
+
+def filter_pattern(lazywp, data):
+    '''
+    Asks the user for a regular expression to filter the log by
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    pattern = lazywp.slinputbox(["Filter the log by a regular expression"]).strip()
+    try:
+        regex = re.compile(pattern) if pattern != '' else None
+    except re.error as error:
+        lazywp.msgbox([f"Invalid regular expression: {error}"])
+        return
+    data['logs_pattern'] = pattern
+    data['logs_regex'] = regex
+    refilter(lazywp, data)
+
+def clear_filter(lazywp, data):
+    '''
+    Clears the level and pattern filter
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    data['logs_level'] = 0
+    data['logs_pattern'] = ''
+    data['logs_regex'] = None
+    refilter(lazywp, data)
+
+def open_log(lazywp, data):
+    '''
+    Asks the user for the path of another log file, like the
+    PHP error log
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    path = lazywp.slinputbox(["Please enter the path of the log file"]).strip()
+    if path == '':
+        return
+    open_tail(lazywp, path)
+    lazywp.content_pad_pos = 0
+    lazywp.cursor_position = 0
+    lazywp.reload_content = True
@@ -0,0 +1,366 @@
+#!/usr/bin/python3
+
+import os, re, json, time, hashlib
+from src.config import MEDIA_WORKERS, MEDIA_SHARD_SIZE, MEDIA_PAGE_SIZE, STATE_PATH
+from src.workers import fan_out
+
+RESULT_PATTERN = re.compile(r'[Rr]egenerated (\d+) of (\d+) images')
+FAILED_PATTERN = re.compile(r'(\d+) failed')
+SKIPPED_PATTERN = re.compile(r'(\d+) skipped')
+
+def config():
+    return {
+        'label': 'Media',
+        'menu': 'Media',
+        'actions': [
+            ['r', 'regenerate', 'Regenerate thumbnails, resumes an interrupted run'],
+            ['c', 'set_concurrency', 'Set the amount of parallel workers'],
+            ['x', 'discard_state', 'Discard the state of an interrupted run']
+        ],
+        'statusbar': [
+            'r: regenerate/resume',
+            'c: concurrency',
+            'x: discard',
+            'esc: stop'
+        ]
+    }
+
+def get_content(lazywp) -> list:
+    '''
+    Builds the content for the media view with the progress of the
+    thumbnail regeneration
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    returns:
+        list: the content to be drawn
+    '''
+    data = lazywp.command_holder
+    lazywp.has_header = False
+    if 'media_workers' not in data:
+        data['media_workers'] = MEDIA_WORKERS
+        data['media_run'] = None
+
+    content = [
+        ["Regenerates the thumbnails of all images in shards of"],
+        [f"{MEDIA_SHARD_SIZE} attachments with {data['media_workers']} parallel workers."],
+        [" "]
+    ]
+
+    run = data['media_run']
+    if run is None:
+        resume = resumable(data)
+        if resume is not None:
+            content.append([f"An interrupted run can be resumed: {resume[0]} of {resume[1]} shards are done."])
+            content.append(["Press [r] to resume or [x] to discard it."])
+        else:
+            content.append(["Press [r] to start."])
+        return content
+
+    # the statistics of the current or last run
+    elapsed = (run['finished'] or time.monotonic()) - run['started']
+    throughput = run['regenerated'] / max(elapsed, 0.001)
+    remaining = run['images'] - run['regenerated'] - run['failed'] - run['skipped'] - run['unsupported']
+    eta = f"{remaining / throughput:.0f}s" if throughput > 0 else '-'
+    content.append([f"Status:       {run['status']}"])
+    content.append([f"Attachments:  {run['images']}"])
+    content.append([f"Shards:       {run['shards_done']}/{run['shards']} ({run['resumed']} done by an earlier run)"])
+    content.append([f"Regenerated:  {run['regenerated']} images, {run['unsupported']} skipped (e.g. SVGs)"])
+    content.append([f"Failed:       {run['failed']} images in {len(run['failures'])} shards", 'entry_active' if run['failures'] else 'default'])
+    content.append([f"Throughput:   {throughput:.1f} images/s with {data['media_workers']} workers"])
+    content.append([f"Elapsed:      {elapsed:.0f}s | ETA: {eta}"])
+
+    if run['failures']:
+        content.append([" "])
+        content.append(["Failed shards:"])
+        for failure in run['failures']:
+            content.append([f"  {failure}"[:lazywp.cols-27], 'log_error'])
+
+    return content
+
+def regenerate(lazywp, data):
+    '''
+    Regenerates the thumbnails. The attachment IDs are listed in pages
+    and split into shards, which are regenerated by parallel workers.
+    Finished shards are written to a journal, so an interrupted run
+    resumes after the last completed shards.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    state = load_state()
+    if state is None:
+        ids = list_attachment_ids(lazywp)
+        if ids is None:
+            return
+        if len(ids) == 0:
+            lazywp.msgbox(["No images found."])
+            return
+        state = {'ids': ids, 'shard_size': MEDIA_SHARD_SIZE, 'done': set()}
+        save_state(state)
+
+    ids = state['ids']
+    shard_size = state['shard_size']
+    shards = [[number, ids[start:start+shard_size]] for number, start in enumerate(range(0, len(ids), shard_size))]
+    pending = [shard for shard in shards if shard[0] not in state['done']]
+
+    run = {
+        'status': 'running',
+        'images': len(ids),
+        'shards': len(shards),
+        'shards_done': len(shards) - len(pending),
+        'resumed': len(shards) - len(pending),
+        'skipped': sum(len(shard[1]) for shard in shards if shard[0] in state['done']),
+        'regenerated': 0,
+        'unsupported': 0,
+        'failed': 0,
+        'failures': [],
+        'started': time.monotonic(),
+        'finished': None
+    }
+    data['media_run'] = run
+
+    def worker(shard):
+        return lazywp.wp_run(f"media regenerate {' '.join(str(id) for id in shard[1])} --yes")
+
+    def on_result(shard, result):
+        returncode, output = result
+        regenerated, failed, skipped = parse_result(returncode, output, len(shard[1]))
+        run['shards_done'] += 1
+        run['regenerated'] += regenerated
+        run['unsupported'] += skipped
+        run['failed'] += failed
+        if failed == 0:
+            append_journal(shard[0])
+        else:
+            message = output.strip().splitlines()[-1] if output.strip() else f"returncode {returncode}"
+            run['failures'].append(f"#{shard[0]} (IDs {shard[1][0]}-{shard[1][-1]}): {message}")
+
+    completed = fan_out(lazywp, pending, worker, on_result, data['media_workers'], lambda: redraw(lazywp), 0.5)
+    run['finished'] = time.monotonic()
+    run['status'] = 'finished' if completed == True else 'stopped, press [r] to resume'
+
+    # a finished run without failures doesn't need to be resumed
+    if completed == True and len(run['failures']) == 0:
+        remove_state()
+    data.pop('media_resume', None)
+    lazywp.reload_content = True
+
+def parse_result(returncode, output, images) -> tuple:
+    '''
+    Parses the result of `wp media regenerate`, like "Regenerated 48
+    of 50 images (2 skipped)." or "Only regenerated 47 of 50 images
+    (2 failed, 1 skipped)." Skipped images, like SVGs, aren't failures.
+
+    Parameters:
+        returncode (int): the returncode
+        output (str): the output
+        images (int): the amount of images in the shard
+
+    Returns:
+        tuple: the amount of regenerated, failed and skipped images
+    '''
+    match = RESULT_PATTERN.search(output)
+    if match is None:
+        if returncode == 0:
+            return images, 0, 0
+        return 0, images, 0
+
+    regenerated = int(match.group(1))
+    skipped = SKIPPED_PATTERN.search(output)
+    skipped = int(skipped.group(1)) if skipped is not None else 0
+    failed = FAILED_PATTERN.search(output)
+    if failed is not None:
+        failed = int(failed.group(1))
+    elif returncode == 0:
+        failed = 0
+    else:
+        failed = int(match.group(2)) - regenerated - skipped
+    return regenerated, failed, skipped
+
+def list_attachment_ids(lazywp):
+    '''
+    Lists the IDs of all image attachments page by page
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    Returns:
+        list: the IDs, None if listing failed
+    '''
+    ids = []
+    page = 1
+    while True:
+        lazywp.msgbox([f"Listing attachments: {len(ids)}"])
+        returncode, output = lazywp.wp_run(f"post list --post_type=attachment --post_mime_type=image --post_status=any --orderby=ID --order=ASC --posts_per_page={MEDIA_PAGE_SIZE} --paged={page} --format=ids")
+        if returncode != 0:
+            lazywp.msgbox(["Could not list the attachments:"] + output.strip().splitlines()[:3])
+            return None
+        page_ids = [int(id) for id in output.split()]
+        ids += page_ids
+        if len(page_ids) < MEDIA_PAGE_SIZE:
+            return ids
+        page += 1
+
+def set_concurrency(lazywp, data):
+    '''
+    Asks the user for the amount of parallel workers
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    workers = lazywp.slinputbox([f"Amount of parallel workers (currently {data['media_workers']})"]).strip()
+    if workers.isdigit() and int(workers) > 0:
+        data['media_workers'] = int(workers)
+    lazywp.reload_content = True
+
+def discard_state(lazywp, data):
+    '''
+    Discards the state of an interrupted run
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if load_state() is None:
+        return
+    if lazywp.askbox(["Discard the interrupted run?"]) == True:
+        remove_state()
+        data['media_run'] = None
+        data.pop('media_resume', None)
+    lazywp.reload_content = True
+
+def redraw(lazywp):
+    '''
+    Redraws the progress while the workers are running
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    Returns:
+        void
+    '''
+    if lazywp.window is None:
+        return
+    lazywp.content = get_content(lazywp)
+    lazywp.draw_content()
+
+def resumable(data):
+    '''
+    Returns the progress of an interrupted run. The state is only
+    loaded once, it's loaded again after a run or after discarding it.
+
+    Parameters:
+        data (dict): the transfer data dict
+
+    Returns:
+        list: the amount of done shards and of all shards, None if there is no interrupted run
+    '''
+    if 'media_resume' not in data:
+        state = load_state()
+        data['media_resume'] = [len(state['done']), shard_count(state)] if state is not None else None
+    return data['media_resume']
+
+def shard_count(state) -> int:
+    '''
+    Returns the amount of shards of a run
+
+    Parameters:
+        state (dict): the state of the run
+
+    Returns:
+        int: the amount of shards
+    '''
+    return -(-len(state['ids']) // state['shard_size'])
+
+def state_file(extension) -> str:
+    '''
+    Returns the path of a state file of the current WordPress
+    installation. The IDs are stored once, the finished shards are
+    appended to a journal.
+
+    Parameters:
+        extension (str): 'json' for the IDs, 'journal' for the shards
+
+    Returns:
+        str: the path
+    '''
+    directory = os.path.expanduser(STATE_PATH)
+    site = hashlib.sha1(os.getcwd().encode('utf-8')).hexdigest()[:12]
+    return f"{directory}/media-{site}.{extension}"
+
+def load_state():
+    '''
+    Loads the state of an interrupted run
+
+    Returns:
+        dict: the state, None if there is none
+    '''
+    try:
+        with open(state_file('json')) as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    state['done'] = set()
+    try:
+        with open(state_file('journal')) as journal:
+            for line in journal:
+                if line.strip().isdigit():
+                    state['done'].add(int(line))
+    except OSError:
+        pass
+    return state
+
+def save_state(state):
+    '''
+    Saves the IDs of a new run and starts an empty journal
+
+    Parameters:
+        state (dict): the state of the run
+
+    Returns:
+        void
+    '''
+    os.makedirs(os.path.expanduser(STATE_PATH), exist_ok=True)
+    temporary = state_file('json.tmp')
+    with open(temporary, 'w') as file:
+        json.dump({'ids': state['ids'], 'shard_size': state['shard_size']}, file)
+    os.replace(temporary, state_file('json'))
+    open(state_file('journal'), 'w').close()
+
+def append_journal(shard):
+    '''
+    Appends a finished shard to the journal
+
+    Parameters:
+        shard (int): the number of the shard
+
+    Returns:
+        void
+    '''
+    with open(state_file('journal'), 'a') as journal:
+        journal.write(f"{shard}\n")
+
+def remove_state():
+    '''
+    Removes the state files
+
+    Returns:
+        void
+    '''
+    for extension in ['json', 'journal']:
+        if os.path.exists(state_file(extension)):
+            os.remove(state_file(extension))
@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+
+import time, shlex
+from src.config import REPLACE_WORKERS
+from src.workers import fan_out
+
+COLUMNS = [
+    ['Table', 0],
+    ['Dry run', 10],
+    ['Replaced', 10],
+    ['Time', 8],
+    ['Status', 10]
+]
+
+def config():
+    return {
+        'label': 'Search & Replace',
+        'menu': 'Replace',
+        'actions': [
+            ['s', 'start_replace', 'Search and replace in all tables'],
+            ['c', 'clear_report', 'Clear the report']
+        ],
+        'statusbar': [
+            's: start',
+            'c: clear',
+            'esc: stop'
+        ]
+    }
+
+def get_content(lazywp) -> list:
+    '''
+    Builds the content for the search replace view with the report
+    of the last run
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    returns:
+        list: the content to be drawn
+    '''
+    data = lazywp.command_holder
+    tables = data.get('replace_tables')
+    if not tables:
+        lazywp.has_header = False
+        return [
+            ["Replaces a string in the database, table by table."],
+            [" "],
+            ["Press [s] to start. A dry run counts the occurrences per table first,"],
+            ["then the tables with occurrences are replaced by parallel workers."]
+        ]
+
+    lazywp.has_header = True
+    content = []
+    header = lazywp.tui.draw_table_row([[column[0], column[1]] for column in COLUMNS], lazywp)
+    content.append([header])
+    content.append([lazywp.tui.draw_table_row([['-' * lazywp.cols, column[1]] for column in COLUMNS], lazywp)])
+
+    lazywp.cursor_position = min(lazywp.cursor_position, len(tables) - 1)
+    for position, row in enumerate(tables):
+        color = 'entry_default'
+        if row['status'] == 'failed':
+            color = 'entry_active'
+        if position == lazywp.cursor_position:
+            color = 'entry_hover' if color == 'entry_default' else 'entry_active_hover'
+
+        cells = [
+            [row['table'], 0],
+            [row['dry'], 10],
+            [row['replaced'], 10],
+            [f"{row['seconds']:.1f}s" if row['seconds'] else '', 8],
+            [row['status'], 10]
+        ]
+        content.append([lazywp.tui.draw_table_row(cells, lazywp), color])
+
+    # the report summary
+    content.append([" "])
+    for line in data.get('replace_summary', []):
+        content.append([line[:lazywp.cols-27]])
+
+    return content
+
+def start_replace(lazywp, data):
+    '''
+    Asks for the search and replace strings, runs a dry run on every
+    table and replaces the tables with occurrences after confirmation
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    search = lazywp.slinputbox(["Search for"]).strip()
+    if search == '':
+        return
+    replace = lazywp.slinputbox([f"Replace '{search}' with"]).strip()
+
+    lazywp.msgbox(["Fetching the tables"])
+    lazywp.wp("db tables", False)
+    if lazywp.wp_returncode != 0:
+        lazywp.msgbox(["Could not fetch the tables:"] + lazywp.wp_output.strip().splitlines()[:3])
+        return
+
+    tables = [table for table in lazywp.wp_output.splitlines() if table != '']
+    data['replace_tables'] = [{'table': table, 'dry': '', 'replaced': '', 'seconds': 0, 'status': 'waiting'} for table in tables]
+    data['replace_summary'] = [f"Dry run: '{search}' -> '{replace}' on {len(tables)} tables with {REPLACE_WORKERS} workers"]
+    lazywp.cursor_position = 0
+    lazywp.content_pad_pos = 0
+
+    # count the occurrences per table
+    started = time.monotonic()
+    completed = run_tables(lazywp, search, replace, data['replace_tables'], 'dry', True)
+    dry_seconds = time.monotonic() - started
+    found = [row for row in data['replace_tables'] if row['status'] == 'found']
+    occurrences = sum(row['dry'] for row in found)
+    data['replace_summary'] = [f"Dry run: {occurrences} occurrences in {len(found)} of {len(tables)} tables ({dry_seconds:.1f}s)"]
+    if completed == False:
+        data['replace_summary'].append("The dry run has been stopped.")
+    lazywp.reload_content = True
+
+    if completed == False or len(found) == 0:
+        return
+    redraw(lazywp)
+    if lazywp.askbox([f"Replace {occurrences} occurrences of '{search}' in {len(found)} tables?"]) != True:
+        return
+
+    # replace in the tables with occurrences only
+    started = time.monotonic()
+    completed = run_tables(lazywp, search, replace, found, 'replaced', False)
+    replaced = sum(row['replaced'] for row in found if row['status'] == 'done')
+    failed = [row['table'] for row in found if row['status'] == 'failed']
+    data['replace_summary'].append(f"Replaced {replaced} occurrences in {len(found) - len(failed)} tables ({time.monotonic() - started:.1f}s)")
+    if completed == False:
+        data['replace_summary'].append("The replacement has been stopped, some tables have not been replaced.")
+    if len(failed) != 0:
+        data['replace_summary'].append(f"Failed: {', '.join(failed)}")
+    lazywp.reload_content = True
+
+def run_tables(lazywp, search, replace, rows, field, dry_run) -> bool:
+    '''
+    Runs wp search-replace for every table with a bounded amount of
+    parallel workers, each one with an explicit table argument. The
+    report is updated as soon as a table is done.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        search (str): the string to search for
+        replace (str): the replacement
+        rows (list): the report rows of the tables
+        field (str): the report field for the count
+        dry_run (bool): only count the occurrences
+
+    Returns:
+        bool: false if the run has been stopped
+    '''
+    arguments = f"{shlex.quote(search)} {shlex.quote(replace)}"
+    flags = "--format=count"
+    if dry_run == True:
+        flags += " --dry-run"
+
+    def worker(row):
+        row['status'] = 'running'
+        started = time.monotonic()
+        returncode, output = lazywp.wp_run(f"search-replace {arguments} {shlex.quote(row['table'])} {flags}")
+        return returncode, output, time.monotonic() - started
+
+    def on_result(row, result):
+        returncode, output, seconds = result
+        row['seconds'] = seconds
+        lines = output.strip().splitlines()
+        if returncode == 0 and len(lines) != 0 and lines[-1].isdigit():
+            row[field] = int(lines[-1])
+            if dry_run == True:
+                row['status'] = 'found' if row[field] > 0 else 'none'
+            else:
+                row['status'] = 'done'
+        else:
+            row['status'] = 'failed'
+            lazywp.log.debug(f"search-replace failed on {row['table']}: {output}")
+
+    for row in rows:
+        row['status'] = 'queued'
+    completed = fan_out(lazywp, rows, worker, on_result, REPLACE_WORKERS, lambda: redraw(lazywp))
+    for row in rows:
+        if row['status'] in ['queued', 'running']:
+            row['status'] = 'stopped'
+    return completed
+
+def redraw(lazywp):
+    '''
+    Redraws the report while the workers are running
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    Returns:
+        void
+    '''
+    if lazywp.window is None:
+        return
+    lazywp.content = get_content(lazywp)
+    lazywp.draw_content()
+
+def clear_report(lazywp, data):
+    '''
+    Clears the report of the last run
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    data['replace_tables'] = []
+    data['replace_summary'] = []
+    lazywp.cursor_position = 0
+    lazywp.content_pad_pos = 0
+    lazywp.reload_content = True
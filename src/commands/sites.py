@@ -0,0 +1,345 @@
+#!/usr/bin/python3
+
+import time, shlex
+from collections import Counter
+from src.config import SITES_WORKERS
+from src.listview import ListView
+from src.spool import Spool
+from src.workers import fan_out
+
+RESULT_COLUMNS = [
+    ['URL', 0],
+    ['RC', 4],
+    ['Time', 8],
+    ['Output', 50]
+]
+
+def row_color(record) -> str:
+    '''
+    Archived, spammed and deleted sites are highlighted
+
+    Parameters:
+        record (Record): the site
+
+    Returns:
+        str: the color
+    '''
+    if '1' in (str(record.archived), str(record.spam), str(record.deleted)):
+        return 'entry_active'
+    return 'entry_default'
+
+view = ListView(
+    label='Sites',
+    command='site list --fields=blog_id,url,last_updated,archived,spam,deleted --format=json',
+    columns=[
+        ['ID', 'blog_id', 8],
+        ['URL', 'url', 0],
+        ['Last updated', 'last_updated', 20]
+    ],
+    key='blog_id',
+    holder='active_site',
+    style=row_color,
+    actions=[
+        ['f', 'fan_out_command', 'Run a wp command on the selected sites'],
+        ['p', 'plugin_status', 'Show the status of a plugin on the selected sites'],
+        ['c', 'flush_cache', 'Flush the object cache of the selected sites'],
+        ['o', 'open_output', 'Show the full output of the result under the cursor'],
+        ['b', 'back_to_sites', 'Go back from the results to the sites']
+    ],
+    statusbar=[
+        'f: fan out',
+        'p: plugin',
+        'c: flush',
+        'b: back'
+    ],
+    empty='No sites found.',
+    fields=['archived', 'spam', 'deleted'],
+    selectable=True
+)
+
+config = view.config
+activate = view.activate
+
+def get_content(lazywp) -> list:
+    '''
+    Builds the content, either the sites or the results of the last
+    fan out
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    returns:
+        list: the content to be drawn
+    '''
+    data = lazywp.command_holder
+    results = data.get('sites_results')
+    if not results:
+        return view.get_content(lazywp)
+
+    lazywp.has_header = True
+    if data.get('sites_width') != lazywp.cols:
+        data['sites_width'] = lazywp.cols
+        for result in results:
+            result['line'] = None
+
+    content = []
+    content.append([lazywp.tui.draw_table_row([[column[0], column[1]] for column in RESULT_COLUMNS], lazywp)])
+    content.append([lazywp.tui.draw_table_row([['-' * lazywp.cols, column[1]] for column in RESULT_COLUMNS], lazywp)])
+
+    lazywp.cursor_position = min(lazywp.cursor_position, len(results) - 1)
+    for position, result in enumerate(results):
+        if result['line'] is None:
+            result['line'] = render_result(result, lazywp)
+        color = 'entry_default'
+        if result['returncode'] not in [None, 0]:
+            color = 'entry_active'
+        if position == lazywp.cursor_position:
+            color = 'entry_hover' if color == 'entry_default' else 'entry_active_hover'
+        content.append([result['line'], color])
+
+    # the aggregated summary
+    content.append([" "])
+    for line in data.get('sites_summary', []):
+        content.append([line[:lazywp.cols-27]])
+
+    return content
+
+def render_result(result, lazywp) -> str:
+    '''
+    Renders a single result, only the first line of the output is shown
+
+    Parameters:
+        result (dict): the result
+        lazywp (obj): the lazywp object
+
+    Returns:
+        str: the rendered result
+    '''
+    lines = result['output'].strip().splitlines()
+    cells = [
+        [result['url'], 0],
+        ['' if result['returncode'] is None else result['returncode'], 4],
+        [f"{result['seconds']:.1f}s" if result['seconds'] else '', 8],
+        [lines[0] if lines else '', 50]
+    ]
+    return lazywp.tui.draw_table_row(cells, lazywp)
+
+def list_only(action):
+    '''
+    Wraps an action of the view, so it is ignored while the results
+    are shown
+
+    Parameters:
+        action (callable): the action
+
+    Returns:
+        callable: the wrapped action
+    '''
+    def call(lazywp, data):
+        if data.get('sites_results'):
+            return
+        action(lazywp, data)
+    return call
+
+sort_rows = list_only(view.sort_rows)
+filter_rows = list_only(view.filter_rows)
+refresh_rows = list_only(view.refresh_rows)
+toggle_selection = list_only(view.toggle_selection)
+select_all = list_only(view.select_all)
+
+def fan_out_command(lazywp, data):
+    '''
+    Asks for a wp command and runs it on the selected sites
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if data.get('sites_results'):
+        return
+    command = lazywp.slinputbox([f"wp command to run on {describe_selection(lazywp)}, e.g. option get blogname"]).strip()
+    if command.startswith('wp '):
+        command = command[3:]
+    if command == '':
+        return
+    run_sites(lazywp, data, command)
+
+def plugin_status(lazywp, data):
+    '''
+    Asks for a plugin and shows its status on the selected sites
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if data.get('sites_results'):
+        return
+    plugin = lazywp.slinputbox([f"Plugin slug to check on {describe_selection(lazywp)}"]).strip()
+    if plugin == '':
+        return
+    run_sites(lazywp, data, f"plugin get {shlex.quote(plugin)} --field=status")
+
+def flush_cache(lazywp, data):
+    '''
+    Flushes the object cache of the selected sites
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if data.get('sites_results'):
+        return
+    if lazywp.askbox([f"Flush the object cache of {describe_selection(lazywp)}?"]) != True:
+        return
+    run_sites(lazywp, data, "cache flush")
+
+def describe_selection(lazywp) -> str:
+    '''
+    Describes the sites an action runs on
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    Returns:
+        str: the description
+    '''
+    if len(view.selection) == 0:
+        selected = lazywp.command_holder.get('active_site')
+        return selected['url'] if selected is not None else 'no site'
+    return f"{len(view.selection)} selected sites"
+
+def run_sites(lazywp, data, command):
+    '''
+    Runs a wp command with --url on every selected site with a
+    bounded amount of parallel workers. The results are collected in
+    one table, which is updated as soon as a site is done.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+        command (str): the wp command without --url
+
+    Returns:
+        void
+    '''
+    sites = view.selected_rows(lazywp)
+    if len(sites) == 0:
+        return
+
+    results = [{'url': site['url'], 'returncode': None, 'seconds': 0, 'output': 'queued', 'line': None} for site in sites]
+    data['sites_results'] = results
+    data['sites_summary'] = [f"wp {command} on {len(sites)} sites with {SITES_WORKERS} workers"]
+    lazywp.cursor_position = 0
+    lazywp.content_pad_pos = 0
+
+    def worker(result):
+        started = time.monotonic()
+        returncode, output = lazywp.wp_run(f"{command} --url={shlex.quote(result['url'])}")
+        return returncode, output, time.monotonic() - started
+
+    def on_result(result, outcome):
+        result['returncode'], result['output'], result['seconds'] = outcome
+        result['line'] = None
+
+    started = time.monotonic()
+    completed = fan_out(lazywp, results, worker, on_result, SITES_WORKERS, lambda: redraw(lazywp), 0.5)
+    for result in results:
+        if result['returncode'] is None:
+            result['output'] = 'stopped'
+            result['line'] = None
+
+    data['sites_summary'] = summarize(command, results, time.monotonic() - started)
+    if completed == False:
+        data['sites_summary'].append("The fan out has been stopped, some sites have not been run.")
+    lazywp.reload_content = True
+
+def summarize(command, results, seconds) -> list:
+    '''
+    Aggregates the results by their first output line
+
+    Parameters:
+        command (str): the wp command
+        results (list): the results
+        seconds (float): the wall time of the fan out
+
+    Returns:
+        list: the summary lines
+    '''
+    done = [result for result in results if result['returncode'] is not None]
+    failed = [result for result in done if result['returncode'] != 0]
+    outputs = Counter((result['output'].strip().splitlines() or [''])[0] for result in done)
+
+    summary = [f"wp {command}: {len(done) - len(failed)} succeeded, {len(failed)} failed on {len(results)} sites ({seconds:.1f}s)"]
+    summary.append(f"{len(outputs)} distinct outputs:")
+    for output, count in outputs.most_common(5):
+        summary.append(f"  {count:>6}x {output}")
+    summary.append("Press [b] to go back to the sites.")
+    return summary
+
+def open_output(lazywp, data):
+    '''
+    Shows the full output of the result under the cursor in the pager
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    results = data.get('sites_results')
+    if not results:
+        return
+    result = results[min(lazywp.cursor_position, len(results) - 1)]
+    spool = Spool()
+    spool.write(result['output'].encode('utf-8'))
+    spool.finish()
+    lazywp.tui.draw_pager(lazywp, spool, result['url'])
+    spool.close()
+    lazywp.reload_content = True
+
+def back_to_sites(lazywp, data):
+    '''
+    Goes back from the results to the sites
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        data (dict): the transfer data dict
+
+    Returns:
+        void
+    '''
+    if not data.get('sites_results'):
+        return
+    data['sites_results'] = []
+    data['sites_summary'] = []
+    lazywp.cursor_position = 0
+    lazywp.content_pad_pos = 0
+
+    # the results replaced the content, so the highlight has to be drawn again
+    view.content = None
+    lazywp.reload_content = True
+
+def redraw(lazywp):
+    '''
+    Redraws the results while the workers are running
+
+    Parameters:
+        lazywp (obj): the lazywp object
+
+    Returns:
+        void
+    '''
+    if lazywp.window is None:
+        return
+    lazywp.content = get_content(lazywp)
+    lazywp.draw_content()
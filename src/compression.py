@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+
+import gzip, bz2, lzma
+
+# zstandard is optional, .zst files are only supported if it's installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXTENSIONS = ['.gz', '.bz2', '.xz', '.zst']
+
+def compressor(raw, path):
+    '''
+    Wraps a file opened for binary writing with the compressor matching
+    the extension of the path. Unknown extensions are written plain.
+
+    Parameters:
+        raw (obj): the file opened with 'wb'
+        path (str): the path of the file
+
+    Returns:
+        obj: a writable file object, closing it doesn't close raw
+    '''
+    if path.endswith('.gz'):
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+    if path.endswith('.bz2'):
+        return bz2.BZ2File(raw, 'wb')
+    if path.endswith('.xz'):
+        return lzma.LZMAFile(raw, 'wb')
+    if path.endswith('.zst'):
+        require_zstandard()
+        return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=False)
+    return Plain(raw)
+
+def decompressor(raw, path):
+    '''
+    Wraps a file opened for binary reading with the decompressor
+    matching the extension of the path. Unknown extensions are read
+    plain.
+
+    Parameters:
+        raw (obj): the file opened with 'rb'
+        path (str): the path of the file
+
+    Returns:
+        obj: a readable file object, closing it doesn't close raw
+    '''
+    if path.endswith('.gz'):
+        return gzip.GzipFile(fileobj=raw, mode='rb')
+    if path.endswith('.bz2'):
+        return bz2.BZ2File(raw, 'rb')
+    if path.endswith('.xz'):
+        return lzma.LZMAFile(raw, 'rb')
+    if path.endswith('.zst'):
+        require_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    return Plain(raw)
+
+def require_zstandard():
+    '''
+    Makes sure the optional zstandard module is installed
+
+    Returns:
+        void
+    '''
+    if zstandard is None:
+        raise RuntimeError('Install the python module zstandard to use .zst files')
+
+class Plain:
+    '''
+    Passes reads and writes through to a file without compression.
+    Closing it leaves the file open, like the compressors do.
+
+    Attributes:
+        raw (obj): the wrapped file
+    '''
+    raw = None
+
+    def __init__(self, raw):
+        '''
+        Sets the wrapped file
+
+        Parameters:
+            raw (obj): the wrapped file
+
+        Returns:
+            void
+        '''
+        self.raw = raw
+
+    def read(self, size=-1) -> bytes:
+        '''
+        Reads from the wrapped file
+
+        Parameters:
+            size (int): the maximum amount of bytes
+
+        Returns:
+            bytes: the data
+        '''
+        return self.raw.read(size)
+
+    def write(self, data) -> int:
+        '''
+        Writes to the wrapped file
+
+        Parameters:
+            data (bytes): the data
+
+        Returns:
+            int: the amount of bytes written
+        '''
+        return self.raw.write(data)
+
+    def close(self) -> None:
+        '''
+        Flushes the wrapped file without closing it
+
+        Returns:
+            void
+        '''
+        self.raw.flush()
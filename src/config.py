@@ -11,4 +11,63 @@ Sets the log level. Possible levels:
 '''
 LOG_LEVEL       = 'DEBUG'
 
+'''
+The log file. Profiles captured with [P] are written next to it,
+or into STATE_PATH if its directory isn't writable
+'''
+LOG_FILE        = '/var/log/lazywp.log'
+
+'''
+Read-only commands like `wp plugin list` skip loading the plugins,
+themes or packages they don't need. Every command line is compared
+to the full bootstrap on its first use, see src/bootstrap.py
+'''
+BOOTSTRAP_PROFILES = True
+
+'''
+Seconds a check of a bootstrap profile is trusted. The checks are
+saved per installation in STATE_PATH and dropped whenever lazywp
+runs a command which may change something
+'''
+BOOTSTRAP_CHECK_TTL = 86400
+
+'''
+Interval in milliseconds in which commands which are following
+something (like the logs) get polled while no key is pressed
+'''
+TICK_INTERVAL   = 250
+
+'''
+Maximum amount of log lines the logs view keeps in memory
+'''
+LOGS_MAX_LINES  = 2000
 
+'''
+Maximum amount of tables which are searched and replaced in parallel
+'''
+REPLACE_WORKERS = 4
+
+'''
+Thumbnail regeneration: the amount of parallel workers, the amount
+of attachments per `wp media regenerate` call and the amount of
+attachment IDs fetched per page
+'''
+MEDIA_WORKERS   = 4
+MEDIA_SHARD_SIZE = 50
+MEDIA_PAGE_SIZE = 1000
+
+'''
+Maximum amount of subsites a command is run on in parallel
+'''
+SITES_WORKERS   = 8
+
+'''
+Seconds after their next run cron events are highlighted as overdue
+'''
+CRON_OVERDUE_AFTER = 60
+
+'''
+Directory for state which needs to survive a restart, like the
+progress of an interrupted thumbnail regeneration
+'''
+STATE_PATH      = '~/.cache/lazywp'
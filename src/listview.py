@@ -0,0 +1,660 @@
+#!/usr/bin/python3
+
+import sys, time, json, shlex, string
+from collections import namedtuple
+from src.stream import iter_json_array, iter_csv
+
+HOVER_COLORS = {
+    'entry_default': 'entry_hover',
+    'entry_active': 'entry_active_hover',
+    'entry_selected': 'entry_selected_hover'
+}
+
+class ListView:
+    '''
+    Declarative list view shared by the command modules. A command
+    declares its wp list command, the columns, the key field, the row
+    styling rule and its actions. The view owns the cached model,
+    re-renders only what changed and takes care of sorting and
+    filtering.
+
+    The output is decoded while wpcli is still writing it and the
+    table fills up progressively. Only the declared fields of each
+    entry are kept, as a compact named tuple. Reloading only renders
+    the entries which changed. Selectable views let the user select
+    several entries by their key, entries sharing a key are selected
+    together.
+
+    Attributes:
+        label (str): the label and menu entry of the command
+        command (str): the wp command listing the entries as json or csv
+        columns (list): list of [header, field, width], width 0 is flexible
+        key (str): the field identifying an entry
+        holder (str): the command_holder key of the selected entry
+        style (callable): returns the color of an entry
+        actions (list): the key bindings of the command
+        statusbar (list): the statusbar entries of the command
+        empty (str): the message if there are no entries
+        fields (list): the fields which are kept of every entry
+        record (type): the named tuple type of the entries
+        draw_interval (float): seconds between redraws while loading
+        error (str): the error output of the last load, if any
+        selectable (bool): whether entries can be selected
+        selection (set): the keys of the selected entries
+        rows (list): the cached entries, None if they need to be loaded
+        order (list): the indexes of the visible entries in display order
+        lines (list): the rendered entries by index
+        cache (dict): the rendered entries of the last load by record
+        content (list): the rendered content
+        width (int): the screen width the content has been rendered for
+        hover (int): the position of the highlighted entry
+        sort_column (int): the index of the sorted column, None if unsorted
+        filter_text (str): the current filter
+
+    Methods:
+        config(): returns the command configuration
+        get_content(): returns the content to be drawn
+        activate(): reloads the entries when the command is entered
+        load(): loads the entries from wpcli
+        compact(): turns a decoded entry into a compact record
+        invalidate(): marks the entries to be loaded again
+        apply_order(): filters and sorts the entries
+        render(): renders the content
+        render_line(): renders a single entry
+        row_color(): returns the color of an entry
+        move_hover(): moves the highlight to the cursor
+        selected(): returns the entry under the cursor
+        run(): runs a wp command and reloads the entries
+        action(): builds an action from a command template
+        toggle(): builds an action switching an entry between states
+        sort_rows(): sorts by the next column
+        filter_rows(): asks for a filter
+        refresh_rows(): reloads the entries
+        toggle_selection(): selects or deselects the entry under the cursor
+        select_all(): selects all filtered entries or clears the selection
+        selected_rows(): returns the selected entries
+        select(): moves the cursor to entries by their keys
+        listed(): returns the visible entries
+    '''
+    label = None
+    command = None
+    columns = None
+    key = None
+    holder = None
+    style = None
+    actions = None
+    statusbar = None
+    empty = None
+    fields = None
+    record = None
+    draw_interval = 0.1
+    error = None
+    selectable = False
+    selection = None
+
+    rows = None
+    order = None
+    lines = None
+    cache = None
+    content = None
+    width = 0
+    hover = None
+    sort_column = None
+    filter_text = ''
+
+    def __init__(self, label, command, columns, key, holder, style=None, actions=[], statusbar=[], empty='No entries found.', fields=[], selectable=False):
+        '''
+        Declares the list view
+
+        Parameters:
+            label (str): the label and menu entry of the command
+            command (str): the wp command listing the entries as json or csv
+            columns (list): list of [header, field, width], width 0 is flexible
+            key (str): the field identifying an entry
+            holder (str): the command_holder key of the selected entry
+            style (callable): returns the color of an entry, gets the record
+            actions (list): the key bindings of the command
+            statusbar (list): the statusbar entries of the command
+            empty (str): the message if there are no entries
+            fields (list): additional fields to keep besides the columns
+            selectable (bool): whether entries can be selected
+
+        Returns:
+            void
+        '''
+        self.label = label
+        self.command = command
+        self.columns = columns
+        self.key = key
+        self.holder = holder
+        self.style = style
+        self.actions = actions
+        self.statusbar = statusbar
+        self.empty = empty
+        self.selectable = selectable
+        self.selection = set()
+
+        # keep the key, the columns and the additional fields only
+        self.fields = [key]
+        for field in [column[1] for column in columns] + fields:
+            if field not in self.fields:
+                self.fields.append(field)
+        self.record = namedtuple('Record', self.fields)
+
+    def config(self) -> dict:
+        '''
+        Returns the command configuration with the shared actions
+        for sorting, filtering and reloading
+
+        Returns:
+            dict: the configuration
+        '''
+        actions = self.actions + [
+            ['s', 'sort_rows', 'Sort by the next column'],
+            ['/', 'filter_rows', 'Filter the entries'],
+            ['R', 'refresh_rows', 'Reload the entries']
+        ]
+        statusbar = self.statusbar + [
+            's: sort',
+            '/: filter'
+        ]
+        if self.selectable == True:
+            actions += [
+                [' ', 'toggle_selection', 'Select or deselect the entry'],
+                ['A', 'select_all', 'Select all filtered entries or clear the selection']
+            ]
+            statusbar += ['space: select']
+
+        return {
+            'label': self.label,
+            'menu': self.label,
+            'actions': actions,
+            'statusbar': statusbar
+        }
+
+    def get_content(self, lazywp) -> list:
+        '''
+        Builds the content. The entries are only loaded if needed and
+        the content is only rendered again if the entries, the order
+        or the screen width changed. Moving the cursor only recolors
+        the two affected entries.
+
+        Parameters:
+            lazywp (obj): the lazywp object
+
+        Returns:
+            list: the content to be drawn
+        '''
+        if self.rows is None:
+            self.load(lazywp)
+
+        if len(self.rows) == 0:
+            lazywp.has_header = False
+            lazywp.command_holder[self.holder] = None
+            if self.error:
+                return [[line[:lazywp.cols-27]] for line in self.error.splitlines()]
+            return [[self.empty]]
+
+        lazywp.has_header = True
+        if self.content is None or self.width != lazywp.cols:
+            self.render(lazywp)
+
+        # keep the cursor within the visible entries
+        lazywp.cursor_position = min(lazywp.cursor_position, max(len(self.order) - 1, 0))
+        self.move_hover(lazywp.cursor_position)
+        lazywp.command_holder[self.holder] = self.selected(lazywp)
+
+        return self.content
+
+    def activate(self, lazywp) -> None:
+        '''
+        Reloads the entries when the command is entered, as they
+        might have been changed outside of lazywp
+
+        Parameters:
+            lazywp (obj): the lazywp object
+
+        Returns:
+            void
+        '''
+        self.invalidate()
+
+    def load(self, lazywp) -> None:
+        '''
+        Loads the entries from wpcli. The entries are decoded while
+        wpcli is still writing and the table is redrawn from time to
+        time, so it fills up progressively.
+
+        Parameters:
+            lazywp (obj): the lazywp object
+
+        Returns:
+            void
+        '''
+        self.rows = []
+        self.lines = []
+        self.order = []
+        self.content = None
+        self.error = None
+
+        decode = iter_json_array
+        if '--format=csv' in self.command:
+            decode = iter_csv
+
+        # the partial content clamps the cursor, the requested position is kept until the end
+        cursor = lazywp.cursor_position
+        drawn = time.monotonic()
+        try:
+            for entry in decode(lazywp.wp_stream(self.command)):
+                if not isinstance(entry, dict):
+                    continue
+                record = self.compact(entry)
+                self.rows.append(record)
+                self.lines.append(self.cache.pop(record, None) if self.cache else None)
+
+                # draw what we have so far
+                if lazywp.window is not None and time.monotonic() - drawn > self.draw_interval:
+                    self.apply_order()
+                    lazywp.content = self.get_content(lazywp)
+                    lazywp.draw_content()
+                    lazywp.cursor_position = cursor
+                    drawn = time.monotonic()
+        except ValueError as error:
+            # e.g. PHP notices within the output, the entries so far are kept
+            self.error = f"Could not decode the output of wp {self.command}: {error}"
+            lazywp.log.warning(self.error)
+
+        if lazywp.wp_returncode != 0:
+            self.error = lazywp.wp_output
+            self.rows = []
+            self.lines = []
+        self.cache = None
+        self.apply_order()
+
+    def compact(self, entry):
+        '''
+        Turns a decoded entry into a compact record. Fields which are
+        not needed are dropped, nested values are kept as JSON text
+        and repeating values are interned.
+
+        Parameters:
+            entry (dict): the decoded entry
+
+        Returns:
+            Record: the record
+        '''
+        values = []
+        for field in self.fields:
+            value = entry.get(field, '')
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value)
+            if isinstance(value, str):
+                value = sys.intern(value)
+            values.append(value)
+        return self.record._make(values)
+
+    def invalidate(self) -> None:
+        '''
+        Marks the entries to be loaded again. The rendered entries
+        are kept, so unchanged entries don't need to be rendered again.
+
+        Returns:
+            void
+        '''
+        if self.rows is not None and self.lines is not None:
+            self.cache = {record: line for record, line in zip(self.rows, self.lines) if line is not None}
+        self.rows = None
+        self.content = None
+
+    def apply_order(self) -> None:
+        '''
+        Filters the entries by the current filter and sorts them by
+        the current sort column
+
+        Returns:
+            void
+        '''
+        positions = [self.fields.index(column[1]) for column in self.columns]
+        order = range(len(self.rows))
+        if self.filter_text != '':
+            needle = self.filter_text.lower()
+            order = [index for index in order if any(needle in str(self.rows[index][position]).lower() for position in positions)]
+        if self.sort_column is not None:
+            position = positions[self.sort_column]
+            order = sorted(order, key=lambda index: str(self.rows[index][position]).lower())
+        self.order = list(order)
+        self.content = None
+
+    def render(self, lazywp) -> None:
+        '''
+        Renders the header and the visible entries
+
+        Parameters:
+            lazywp (obj): the lazywp object
+
+        Returns:
+            void
+        '''
+        if self.width != lazywp.cols:
+            self.width = lazywp.cols
+            self.lines = [None] * len(self.rows)
+
+        headers = []
+        for position, column in enumerate(self.columns):
+            header = column[0]
+            if position == self.sort_column:
+                header += ' ^'
+            headers.append([header, column[2]])
+        header = lazywp.tui.draw_table_row(headers, lazywp)
+        spacer = lazywp.tui.draw_table_row([['-' * lazywp.cols, column[2]] for column in self.columns], lazywp)
+
+        self.content = [[header], [spacer]]
+        for index in self.order:
+            self.content.append([self.render_line(index, lazywp), self.row_color(index)])
+        if len(self.order) == 0:
+            self.content.append([f"No entries match the filter '{self.filter_text}'."])
+        self.hover = None
+
+    def render_line(self, index, lazywp) -> str:
+        '''
+        Renders a single entry, rendered entries are cached
+
+        Parameters:
+            index (int): the index of the entry
+            lazywp (obj): the lazywp object
+
+        Returns:
+            str: the rendered entry
+        '''
+        if self.lines[index] is None:
+            row = self.rows[index]
+            cells = [[getattr(row, column[1]), column[2]] for column in self.columns]
+            self.lines[index] = lazywp.tui.draw_table_row(cells, lazywp)
+        return self.lines[index]
+
+    def row_color(self, index) -> str:
+        '''
+        Returns the color of an entry by the styling rule
+
+        Parameters:
+            index (int): the index of the entry
+
+        Returns:
+            str: the color
+        '''
+        if self.selectable == True and self.rows[index][0] in self.selection:
+            return 'entry_selected'
+        if self.style is None:
+            return 'entry_default'
+        return self.style(self.rows[index])
+
+    def move_hover(self, position) -> None:
+        '''
+        Moves the highlight to the cursor by recoloring the previous
+        and the current entry
+
+        Parameters:
+            position (int): the cursor position
+
+        Returns:
+            void
+        '''
+        if position == self.hover or len(self.order) == 0:
+            return
+        if self.hover is not None:
+            self.content[self.hover + 2][1] = self.row_color(self.order[self.hover])
+        color = self.row_color(self.order[position])
+        self.content[position + 2][1] = HOVER_COLORS.get(color, color)
+        self.hover = position
+
+    def selected(self, lazywp):
+        '''
+        Returns the entry under the cursor
+
+        Parameters:
+            lazywp (obj): the lazywp object
+
+        Returns:
+            dict: the entry, None if there is none
+        '''
+        if self.rows is None or len(self.order) == 0:
+            return None
+        position = min(lazywp.cursor_position, len(self.order) - 1)
+        return self.rows[self.order[position]]._asdict()
+
+    def run(self, lazywp, command, message, report=False) -> None:
+        '''
+        Runs a wp command which changes the entries and reloads them
+
+        Parameters:
+            lazywp (obj): the lazywp object
+            command (str): the wp command
+            message (str): the message displayed while running
+            report (bool): shows the output instead of reloading the entries
+
+        Returns:
+            void
+        '''
+        lazywp.msgbox([message])
+        lazywp.wp(command, False)
+        if report == True:
+            lines = lazywp.wp_output.strip().splitlines()
+            lazywp.msgbox(lines[-3:] or ["Done"])
+            return
+        self.invalidate()
+        lazywp.reload_content = True
+
+    def action(self, command, message, question=None, prompt=None, report=False):
+        '''
+        Builds an action for the entry under the cursor from templates.
+        Fields of the entry can be used as {field} and are shell quoted.
+        With a prompt the user is asked for a value first, which can be
+        used as {input}.
+
+        Parameters:
+            command (str): the wp command template
+            message (str): the message template
+            question (str): a confirmation template, if needed
+            prompt (str): the template of the input box, if needed
+            report (bool): shows the output instead of reloading the entries
+
+        Returns:
+            callable: the action
+        '''
+        fields = [name for _, name, _, _ in string.Formatter().parse(command) if name not in [None, 'input']]
+
+        def call(lazywp, data):
+            row = data.get(self.holder)
+            if row is None and (len(fields) != 0 or question is not None):
+                return
+            values = dict(row or {})
+            if prompt is not None:
+                value = lazywp.slinputbox([prompt.format(**values)]).strip()
+                if value == '':
+                    return
+                values['input'] = value
+            if question is not None and lazywp.askbox([question.format(**values)]) != True:
+                return
+            quoted = {field: shlex.quote(str(value)) for field, value in values.items()}
+            self.run(lazywp, command.format(**quoted), message.format(**values), report)
+        return call
+
+    def toggle(self, field, states):
+        '''
+        Builds an action which switches the entry under the cursor
+        between states, like active and inactive. Entries in a state
+        without a template are left alone.
+
+        Parameters:
+            field (str): the field holding the state
+            states (dict): the command and message templates by the current state
+
+        Returns:
+            callable: the action
+        '''
+        actions = {state: self.action(command, message) for state, (command, message) in states.items()}
+
+        def call(lazywp, data):
+            row = data.get(self.holder)
+            if row is None or row[field] not in actions:
+                return
+            actions[row[field]](lazywp, data)
+        return call
+
+    def sort_rows(self, lazywp, data) -> None:
+        '''
+        Sorts the entries by the next column, after the last column
+        the original order is restored
+
+        Parameters:
+            lazywp (obj): the lazywp object
+            data (dict): the transfer data dict
+
+        Returns:
+            void
+        '''
+        if self.rows is None:
+            return
+        if self.sort_column is None:
+            self.sort_column = 0
+        elif self.sort_column < len(self.columns) - 1:
+            self.sort_column += 1
+        else:
+            self.sort_column = None
+        self.apply_order()
+        lazywp.reload_content = True
+
+    def filter_rows(self, lazywp, data) -> None:
+        '''
+        Asks the user for a text to filter the entries by
+
+        Parameters:
+            lazywp (obj): the lazywp object
+            data (dict): the transfer data dict
+
+        Returns:
+            void
+        '''
+        if self.rows is None:
+            return
+        self.filter_text = lazywp.slinputbox(["Filter the entries, leave empty to clear"]).strip()
+        self.apply_order()
+        lazywp.cursor_position = 0
+        lazywp.content_pad_pos = 0
+        lazywp.reload_content = True
+
+    def refresh_rows(self, lazywp, data) -> None:
+        '''
+        Reloads the entries from wpcli
+
+        Parameters:
+            lazywp (obj): the lazywp object
+            data (dict): the transfer data dict
+
+        Returns:
+            void
+        '''
+        self.invalidate()
+        lazywp.reload_content = True
+
+    def toggle_selection(self, lazywp, data) -> None:
+        '''
+        Selects or deselects the entry under the cursor and moves the
+        cursor to the next entry
+
+        Parameters:
+            lazywp (obj): the lazywp object
+            data (dict): the transfer data dict
+
+        Returns:
+            void
+        '''
+        if self.rows is None or len(self.order) == 0:
+            return
+        position = lazywp.cursor_position
+        key = self.rows[self.order[position]][0]
+        if key in self.selection:
+            self.selection.remove(key)
+        else:
+            self.selection.add(key)
+
+        # only the entries with this key change their color
+        for other, index in enumerate(self.order):
+            if self.rows[index][0] == key:
+                self.content[other + 2][1] = self.row_color(index)
+        self.hover = None
+        lazywp.cursor_position = min(position + 1, len(self.order) - 1)
+        lazywp.reload_content = True
+
+    def select_all(self, lazywp, data) -> None:
+        '''
+        Selects all filtered entries, or clears the selection if there
+        is one
+
+        Parameters:
+            lazywp (obj): the lazywp object
+            data (dict): the transfer data dict
+
+        Returns:
+            void
+        '''
+        if self.rows is None:
+            return
+        if len(self.selection) != 0:
+            self.selection = set()
+        else:
+            self.selection = {self.rows[index][0] for index in self.order}
+        self.content = None
+        lazywp.reload_content = True
+
+    def selected_rows(self, lazywp) -> list:
+        '''
+        Returns the selected entries, or the entry under the cursor if
+        nothing is selected
+
+        Parameters:
+            lazywp (obj): the lazywp object
+
+        Returns:
+            list: the entries as dicts
+        '''
+        if self.rows is None:
+            return []
+        if len(self.selection) == 0:
+            row = self.selected(lazywp)
+            return [row] if row is not None else []
+        return [row._asdict() for row in self.rows if row[0] in self.selection]
+
+    def select(self, lazywp, keys) -> list:
+        '''
+        Moves the cursor to the entry with the first key. Selectable
+        views select all entries with the given keys.
+
+        Parameters:
+            lazywp (obj): the lazywp object
+            keys (list): the keys of the entries
+
+        Returns:
+            list: the keys which haven't been found
+        '''
+        if self.rows is None:
+            self.load(lazywp)
+        positions = {str(self.rows[index][0]): position for position, index in enumerate(self.order)}
+        found = [key for key in keys if str(key) in positions]
+        if len(found) != 0:
+            lazywp.cursor_position = positions[str(found[0])]
+        if self.selectable == True:
+            self.selection = {self.rows[self.order[positions[str(key)]]][0] for key in found}
+            self.content = None
+        return [key for key in keys if str(key) not in positions]
+
+    def listed(self) -> list:
+        '''
+        Returns the visible entries in display order
+
+        Returns:
+            list: the entries as dicts
+        '''
+        if self.rows is None:
+            return []
+        return [self.rows[index]._asdict() for index in self.order]
@@ -2,6 +2,7 @@
 
 # TODO comments
 import logging
+from src.config import LOG_FILE
 
 class Logging:
     logger = None
@@ -48,7 +49,7 @@ class Logging:
         formatter = logging.Formatter(format, "%Y-%m-%d %H:%M:%S")
         
         # file logging
-        fh = logging.FileHandler('/var/log/lazywp.log')
+        fh = logging.FileHandler(LOG_FILE)
         fh.setFormatter(formatter)
         fh.setLevel(self.log_levels[self.log_level])
         self.logger.addHandler(fh)
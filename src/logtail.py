@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+
+import os
+
+class LogTail:
+    '''
+    Follows a log file like `tail -F`. The file is opened by seeking
+    from the end, so only the last lines are read, never the whole file.
+    Appends are detected by polling the file stats, rotation by a
+    changed inode and truncation by a shrinking file size. The lines
+    are returned to the caller, which keeps its own window of them.
+
+    Attributes:
+        path (str): the path of the log file
+        max_lines (int): the amount of lines read at most
+        position (int): the byte position up to which the file is read
+        inode (int): the inode of the currently followed file
+        partial (bytes): an incomplete last line waiting for its line break
+        chunk_size (int): the size of the blocks which are read
+        catch_up_size (int): appends larger than this are read from the end
+
+    Methods:
+        open(): reads the last lines of the file
+        poll(): reads lines which have been appended since the last poll
+        read_tail(): reads the last lines from the end of a file
+        read_appended(): reads the file from the current position
+        split(): splits raw data into complete lines
+    '''
+    path = None
+    max_lines = 0
+    position = 0
+    inode = None
+    partial = b''
+    chunk_size = 65536
+    catch_up_size = 4194304
+
+    def __init__(self, path, max_lines=2000):
+        '''
+        Sets the path and the amount of lines read at most
+
+        Parameters:
+            path (str): the path of the log file
+            max_lines (int): the amount of lines read at most
+
+        Returns:
+            void
+        '''
+        self.path = path
+        self.max_lines = max_lines
+
+    def open(self) -> list:
+        '''
+        Reads the last lines of the file. A missing file is not an
+        error, it's picked up by poll() as soon as it exists.
+
+        Returns:
+            list: the lines which have been read
+        '''
+        self.partial = b''
+        self.position = 0
+        self.inode = None
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+        self.inode = stat.st_ino
+        return self.read_tail(stat.st_size)
+
+    def poll(self) -> list:
+        '''
+        Checks the file for appends, rotation and truncation and reads
+        the new lines
+
+        Returns:
+            list: the lines which have been appended
+        '''
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+
+        # the file has been rotated, start over with the new one
+        if stat.st_ino != self.inode:
+            self.inode = stat.st_ino
+            self.position = 0
+            self.partial = b''
+
+        # the file has been truncated
+        if stat.st_size < self.position:
+            self.position = 0
+            self.partial = b''
+
+        if stat.st_size == self.position:
+            return []
+
+        # we are too far behind, only the end is of interest
+        if stat.st_size - self.position > self.catch_up_size:
+            self.partial = b''
+            return self.read_tail(stat.st_size)
+
+        return self.read_appended()
+
+    def read_tail(self, size) -> list:
+        '''
+        Reads blocks backwards from the end of the file until enough
+        line breaks for the line window have been found
+
+        Parameters:
+            size (int): the current size of the file
+
+        Returns:
+            list: the lines which have been read
+        '''
+        blocks = []
+        line_breaks = 0
+        start = size
+        with open(self.path, 'rb') as log:
+            while start > 0 and line_breaks <= self.max_lines:
+                length = min(self.chunk_size, start)
+                start -= length
+                log.seek(start)
+                block = log.read(length)
+                line_breaks += block.count(b'\n')
+                blocks.append(block)
+        self.position = size
+
+        # the first line is cut off if we didn't reach the beginning
+        data = b''.join(reversed(blocks))
+        if start > 0:
+            data = data[data.find(b'\n')+1:]
+        return self.split(data)
+
+    def read_appended(self) -> list:
+        '''
+        Reads everything which has been appended since the last read
+
+        Returns:
+            list: the lines which have been read
+        '''
+        lines = []
+        with open(self.path, 'rb') as log:
+            log.seek(self.position)
+            chunk = log.read(self.chunk_size)
+            while chunk:
+                self.position += len(chunk)
+                lines += self.split(chunk)
+                chunk = log.read(self.chunk_size)
+        return lines[-self.max_lines:]
+
+    def split(self, data) -> list:
+        '''
+        Splits raw data into complete lines. An incomplete last line
+        is kept until it's finished.
+
+        Parameters:
+            data (bytes): the raw data
+
+        Returns:
+            list: the complete lines
+        '''
+        raw_lines = (self.partial + data).split(b'\n')
+        self.partial = raw_lines.pop()
+        return [line.rstrip(b'\r').decode('utf-8', 'replace') for line in raw_lines[-self.max_lines:]]
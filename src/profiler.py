@@ -0,0 +1,99 @@
+#!/usr/bin/python3
+
+import os, time, pstats, cProfile, tracemalloc
+
+class Profiler:
+    '''
+    Captures a cProfile and tracemalloc profile of the session. The
+    capture is started and stopped by a hotkey, stopping it writes
+    the pstats file and the top allocations into a directory.
+
+    cProfile only sees the main thread, the workers of a fan out show
+    up as the time the main thread waits for them.
+
+    Attributes:
+        profile (obj): the running cProfile profile, None if stopped
+        started (float): the time the capture started
+        frames (int): the amount of frames tracemalloc keeps per allocation
+        top (int): the amount of entries in the summaries
+
+    Methods:
+        running(): returns if a capture is running
+        start(): starts the capture
+        stop(): stops the capture and writes the files
+    '''
+    profile = None
+    started = 0
+    frames = 10
+    top = 25
+
+    def running(self) -> bool:
+        '''
+        Returns if a capture is running
+
+        Returns:
+            bool: true if a capture is running
+        '''
+        return self.profile is not None
+
+    def start(self) -> None:
+        '''
+        Starts the capture
+
+        Returns:
+            void
+        '''
+        tracemalloc.start(self.frames)
+        self.started = time.monotonic()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, directory) -> list:
+        '''
+        Stops the capture and writes the pstats file and the top
+        allocations into the directory
+
+        Parameters:
+            directory (str): the directory for the files
+
+        Returns:
+            list: a short summary
+        '''
+        self.profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        seconds = time.monotonic() - self.started
+        profile = self.profile
+        self.profile = None
+
+        # leave out the allocations of the profilers themselves
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>')
+        ])
+        allocations = snapshot.statistics('lineno')
+
+        base = os.path.join(directory, f"lazywp-profile-{time.strftime('%Y%m%d-%H%M%S')}")
+        profile.dump_stats(f"{base}.pstats")
+        with open(f"{base}.allocations.txt", 'w') as file:
+            file.write(f"Captured {seconds:.1f}s, traced memory {current / 1048576:.1f} MB, peak {peak / 1048576:.1f} MB\n\n")
+            for statistic in allocations[:self.top]:
+                file.write(f"{statistic}\n")
+                for line in statistic.traceback.format()[-4:]:
+                    file.write(f"    {line}\n")
+
+        # the functions with the most time spent in them, without waiting for keys
+        stats = pstats.Stats(profile)
+        functions = [item for item in stats.stats.items() if 'getch' not in item[0][2]]
+        functions.sort(key=lambda item: item[1][3], reverse=True)
+        summary = [f"Profiled {seconds:.1f}s, {stats.total_calls} calls, peak memory {peak / 1048576:.1f} MB"]
+        for (path, line, name), (_, _, _, cumulative, _) in functions[:3]:
+            summary.append(f"  {cumulative:.2f}s {name} ({os.path.basename(path)}:{line})")
+        if len(allocations) != 0:
+            summary.append(f"  Top allocation: {allocations[0].size / 1024:.0f} KB at {allocations[0].traceback[0]}")
+        summary.append(f"Written to {base}.pstats")
+        summary.append(f"and {base}.allocations.txt")
+        return summary
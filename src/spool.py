@@ -0,0 +1,165 @@
+#!/usr/bin/python3
+
+import tempfile, mmap
+from array import array
+from bisect import bisect_right
+
+class Spool:
+    '''
+    Spools (possibly huge) command output into a temporary file and
+    keeps an index of line offsets, so single lines can be read through
+    mmap without holding the whole output in memory
+
+    Attributes:
+        file (obj): the temporary file holding the raw output
+        map (obj): the read-only mmap of the file, set by finish()
+        offsets (array): byte offsets of every line start
+        size (int): the amount of bytes written
+
+    Methods:
+        write(): appends a chunk and indexes its line breaks
+        finish(): flushes the file and maps it into memory
+        line_count(): returns the amount of lines
+        line(): returns a single decoded line
+        lines(): returns a range of decoded lines
+        search(): finds the next line containing a pattern
+        close(): releases the mmap and the temporary file
+    '''
+    file = None
+    map = None
+    offsets = None
+    size = 0
+
+    def __init__(self):
+        '''
+        Creates the temporary file and the offset index
+
+        Returns:
+            void
+        '''
+        self.file = tempfile.TemporaryFile(prefix='lazywp-')
+        self.offsets = array('Q', [0])
+        self.size = 0
+
+    def write(self, chunk) -> None:
+        '''
+        Appends a chunk of raw output and records the offset of
+        every line which starts within it
+
+        Parameters:
+            chunk (bytes): the raw output
+
+        Returns:
+            void
+        '''
+        self.file.write(chunk)
+        position = chunk.find(b'\n')
+        while position != -1:
+            self.offsets.append(self.size + position + 1)
+            position = chunk.find(b'\n', position + 1)
+        self.size += len(chunk)
+
+    def finish(self) -> None:
+        '''
+        Flushes the written output and maps the file for random
+        access. Empty files can't be mapped, so they stay unmapped.
+
+        Returns:
+            void
+        '''
+        self.file.flush()
+        if self.size > 0:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def line_count(self) -> int:
+        '''
+        Returns the amount of lines. A trailing line break does not
+        open a new line.
+
+        Returns:
+            int: the amount of lines
+        '''
+        count = len(self.offsets)
+        if self.offsets[-1] == self.size:
+            count -= 1
+        return count
+
+    def line(self, number) -> str:
+        '''
+        Reads a single line from the mapped file
+
+        Parameters:
+            number (int): the line number, starting at 0
+
+        Returns:
+            str: the decoded line without its line break
+        '''
+        if self.map is None or number < 0 or number >= self.line_count():
+            return ''
+        start = self.offsets[number]
+        end = self.size
+        if number + 1 < len(self.offsets):
+            end = self.offsets[number + 1]
+        raw = self.map[start:end].rstrip(b'\r\n')
+        return raw.decode('utf-8', 'replace')
+
+    def lines(self, start, amount) -> list:
+        '''
+        Reads a range of lines from the mapped file
+
+        Parameters:
+            start (int): the first line number
+            amount (int): the maximum amount of lines
+
+        Returns:
+            list: the decoded lines
+        '''
+        end = min(start + amount, self.line_count())
+        return [self.line(number) for number in range(start, end)]
+
+    def search(self, pattern, start=0, backwards=False) -> int:
+        '''
+        Scans the mapped file for a pattern and returns the line it
+        was found in. The search wraps around the end of the file.
+
+        Parameters:
+            pattern (str): the string to search for
+            start (int): the line to start the search at
+            backwards (bool): search towards the beginning
+
+        Returns:
+            int: the line number or -1 if nothing has been found
+        '''
+        if self.map is None or pattern == '':
+            return -1
+        needle = pattern.encode('utf-8')
+
+        # a start past the last line wraps to the first one
+        if start >= self.line_count() or start < 0:
+            start = 0
+        offset = self.offsets[start]
+
+        if backwards == True:
+            position = self.map.rfind(needle, 0, offset)
+            if position == -1:
+                position = self.map.rfind(needle, offset)
+        else:
+            position = self.map.find(needle, offset)
+            if position == -1:
+                position = self.map.find(needle, 0, offset)
+
+        if position == -1:
+            return -1
+        return bisect_right(self.offsets, position) - 1
+
+    def close(self) -> None:
+        '''
+        Releases the mmap and removes the temporary file
+
+        Returns:
+            void
+        '''
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
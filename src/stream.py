@@ -0,0 +1,104 @@
+#!/usr/bin/python3
+
+import json, csv, codecs
+
+def iter_text(chunks):
+    '''
+    Decodes raw chunks to text. Multibyte characters which are split
+    across chunks are kept until they are complete.
+
+    Parameters:
+        chunks (iterable): the raw chunks
+
+    Returns:
+        generator: the decoded chunks
+    '''
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text != '':
+            yield text
+    text = decoder.decode(b'', True)
+    if text != '':
+        yield text
+
+# the characters a json value can start with
+JSON_START = '{"-0123456789tfn'
+
+def iter_json_array(chunks):
+    '''
+    Decodes a json array incrementally and yields every record as soon
+    as it's complete. Only the unfinished record is buffered, so the
+    whole output is never held in memory. Records separated by line
+    breaks instead of an array (ndjson) are decoded as well. Lines
+    which can't start a json value, like PHP notices, are skipped.
+
+    Parameters:
+        chunks (iterable): the raw chunks
+
+    Returns:
+        generator: the decoded records
+    '''
+    decoder = json.JSONDecoder()
+    buffer = ''
+    for text in iter_text(chunks):
+        buffer += text
+        position = 0
+        while True:
+            # skip whitespace, the array brackets and the separators
+            while position < len(buffer) and buffer[position] in ' \t\r\n[],':
+                position += 1
+            if position == len(buffer):
+                break
+
+            # skip lines which aren't json, once they are complete
+            if buffer[position] not in JSON_START:
+                newline = buffer.find('\n', position)
+                if newline == -1:
+                    break
+                position = newline + 1
+                continue
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # the record is incomplete, wait for the next chunk
+                break
+            yield record
+            position = end
+        buffer = buffer[position:]
+
+    if buffer.strip() != '':
+        raise ValueError(f"Incomplete json output: {buffer[:80]}")
+
+def iter_csv(chunks):
+    '''
+    Decodes csv output incrementally and yields every record as a dict
+    keyed by the header line
+
+    Parameters:
+        chunks (iterable): the raw chunks
+
+    Returns:
+        generator: the decoded records
+    '''
+    return csv.DictReader(iter_lines(chunks))
+
+def iter_lines(chunks):
+    '''
+    Splits decoded chunks into lines
+
+    Parameters:
+        chunks (iterable): the raw chunks
+
+    Returns:
+        generator: the lines including their line breaks
+    '''
+    buffer = ''
+    for text in iter_text(chunks):
+        buffer += text
+        lines = buffer.split('\n')
+        buffer = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    if buffer != '':
+        yield buffer
@@ -0,0 +1,499 @@
+#!/usr/bin/python3
+
+import os, sys, json, time, pty, fcntl, termios, struct, threading
+from math import ceil
+from collections import deque
+from contextlib import contextmanager
+from statistics import mean, median
+
+class ReplayFinished(Exception):
+    '''
+    Raised when a replay has fed all recorded keys
+    '''
+
+class ReplayError(Exception):
+    '''
+    Raised when the replayed session asks for something which
+    isn't part of the trace
+    '''
+
+class TraceWindow:
+    '''
+    Wraps the curses window so every getch() is passed through the
+    trace. Everything else is forwarded to the real window.
+
+    Attributes:
+        window (obj): the curses window
+        trace (obj): the recorder or replayer
+    '''
+    window = None
+    trace = None
+
+    def __init__(self, window, trace):
+        self.window = window
+        self.trace = trace
+
+    def __getattr__(self, name):
+        '''
+        Forwards everything else to the curses window
+        '''
+        return getattr(self.window, name)
+
+    def getch(self) -> int:
+        '''
+        Reads a key through the trace
+
+        Returns:
+            int: the key
+        '''
+        return self.trace.getch(self.window)
+
+class Recorder:
+    '''
+    Records a session as a trace. The trace is a JSON lines file with
+    a header, the pressed keys, the single line inputs, every wp
+    command with its output, the lines read from files and the ticks
+    which changed the content, each with a timestamp in seconds.
+    Timeouts of getch() without a change aren't recorded.
+
+    Attributes:
+        replaying (bool): always false for the recorder
+        file (obj): the trace file
+        started (float): the time the recording started
+        lock (obj): serializes writes from worker threads
+
+    Methods:
+        start(): writes the trace header
+        wrap(): wraps the curses window
+        getch(): reads and records a key
+        input(): reads and records a single line input
+        read(): reads and records lines of a file
+        tick(): records a tick which changed the content
+        wp(): runs and records a wp command
+        record(): records the result of a wp command
+        write(): writes an event to the trace
+        close(): closes the trace file
+    '''
+    replaying = False
+    file = None
+    started = 0
+    lock = None
+
+    def __init__(self, path):
+        '''
+        Opens the trace file
+
+        Parameters:
+            path (str): the path of the trace file
+
+        Returns:
+            void
+        '''
+        self.file = open(path, 'w', encoding='utf-8')
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def start(self, rows, cols, version) -> None:
+        '''
+        Writes the trace header with the terminal dimensions
+
+        Parameters:
+            rows (int): the height of the terminal
+            cols (int): the width of the terminal
+            version (str): the lazywp version
+
+        Returns:
+            void
+        '''
+        self.write({'type': 'header', 'rows': rows, 'cols': cols, 'version': version})
+
+    def wrap(self, window) -> TraceWindow:
+        '''
+        Wraps the curses window so its keys get recorded
+
+        Parameters:
+            window (obj): the curses window
+
+        Returns:
+            TraceWindow: the wrapped window
+        '''
+        return TraceWindow(window, self)
+
+    def getch(self, window) -> int:
+        '''
+        Reads a key from the window and records it. A timeout is
+        only recorded as a tick if it changed the content.
+
+        Parameters:
+            window (obj): the curses window
+
+        Returns:
+            int: the key, -1 on a timeout
+        '''
+        key = window.getch()
+        if key != -1:
+            self.write({'type': 'key', 'key': key})
+        return key
+
+    def input(self, reader) -> str:
+        '''
+        Reads a single line input and records it
+
+        Parameters:
+            reader (callable): displays the input box and returns the input
+
+        Returns:
+            str: the input
+        '''
+        value = reader()
+        self.write({'type': 'input', 'value': value})
+        return value
+
+    def read(self, path, reader) -> list:
+        '''
+        Reads lines of a file and records them, reads without new
+        lines aren't recorded
+
+        Parameters:
+            path (str): the path of the file
+            reader (callable): reads the file and returns the new lines
+
+        Returns:
+            list: the lines
+        '''
+        lines = reader()
+        if len(lines) != 0:
+            self.write({'type': 'read', 'path': path, 'lines': lines})
+        return lines
+
+    def tick(self) -> None:
+        '''
+        Records a tick which changed the content
+
+        Returns:
+            void
+        '''
+        self.write({'type': 'tick'})
+
+    def wp(self, command, runner) -> tuple:
+        '''
+        Runs a wp command and records its result
+
+        Parameters:
+            command (str): the wp command
+            runner (callable): runs the command and returns its result
+
+        Returns:
+            tuple: the returncode and the output
+        '''
+        returncode, output = runner()
+        self.record(command, returncode, output)
+        return returncode, output
+
+    def record(self, command, returncode, output) -> None:
+        '''
+        Records the result of a wp command
+
+        Parameters:
+            command (str): the wp command
+            returncode (int): the returncode
+            output (str): the output
+
+        Returns:
+            void
+        '''
+        self.write({'type': 'wp', 'command': command, 'returncode': returncode, 'output': output})
+
+    def write(self, event) -> None:
+        '''
+        Writes an event to the trace. Every event is flushed, so the
+        trace survives a crash or sys.exit().
+
+        Parameters:
+            event (dict): the event
+
+        Returns:
+            void
+        '''
+        event['t'] = round(time.monotonic() - self.started, 6)
+        with self.lock:
+            self.file.write(json.dumps(event) + '\n')
+            self.file.flush()
+
+    def close(self) -> None:
+        '''
+        Closes the trace file
+
+        Returns:
+            void
+        '''
+        self.file.close()
+
+class Replayer:
+    '''
+    Replays a recorded trace. The keys and ticks are fed as fast as
+    possible, wp commands and file reads are answered from the trace,
+    so no wpcli, WordPress or log file is needed. The time between
+    handing out a key and the next getch() is the time lazywp needed
+    to handle the key and draw the frame.
+
+    Attributes:
+        replaying (bool): always true for the replayer
+        path (str): the path of the trace file
+        rows (int): the recorded height of the terminal
+        cols (int): the recorded width of the terminal
+        keys (deque): the recorded keys, -1 for a tick
+        inputs (deque): the recorded single line inputs
+        outputs (dict): the recorded wp results by command
+        reads (dict): the recorded lines by file
+        frames (list): the key and duration of every replayed frame
+        served (int): the amount of wp commands answered from the trace
+        started (float): the time the replay started
+        returned (float): the time the last key was handed out
+        lock (obj): guards the outputs against worker threads
+
+    Methods:
+        start(): starts the wall clock
+        wrap(): wraps the curses window
+        getch(): hands out the next key and times the last frame
+        input(): hands out the next single line input
+        read(): hands out the next lines of a file
+        tick(): ignored while replaying
+        wp(): answers a wp command
+        replay(): returns the recorded result of a wp command
+        report(): builds the timing report
+    '''
+    replaying = True
+    path = None
+    rows = 30
+    cols = 126
+    keys = None
+    inputs = None
+    outputs = None
+    reads = None
+    frames = None
+    served = 0
+    started = 0
+    returned = None
+    lock = None
+
+    def __init__(self, path):
+        '''
+        Loads the trace
+
+        Parameters:
+            path (str): the path of the trace file
+
+        Returns:
+            void
+        '''
+        self.path = path
+        self.keys = deque()
+        self.inputs = deque()
+        self.outputs = {}
+        self.reads = {}
+        self.frames = []
+        self.lock = threading.Lock()
+
+        with open(path, encoding='utf-8') as trace:
+            for line in trace:
+                event = json.loads(line)
+                if event['type'] == 'header':
+                    self.rows = event['rows']
+                    self.cols = event['cols']
+                elif event['type'] == 'key':
+                    self.keys.append(event['key'])
+                elif event['type'] == 'tick':
+                    self.keys.append(-1)
+                elif event['type'] == 'input':
+                    self.inputs.append(event['value'])
+                elif event['type'] == 'read':
+                    self.reads.setdefault(event['path'], deque()).append(event['lines'])
+                elif event['type'] == 'wp':
+                    results = self.outputs.setdefault(event['command'], deque())
+                    results.append([event['returncode'], event['output']])
+
+    def start(self, rows, cols, version) -> None:
+        '''
+        Starts the wall clock. The dimensions are taken from the trace.
+
+        Returns:
+            void
+        '''
+        self.started = time.perf_counter()
+
+    def wrap(self, window) -> TraceWindow:
+        '''
+        Wraps the curses window so it gets the recorded keys
+
+        Parameters:
+            window (obj): the curses window
+
+        Returns:
+            TraceWindow: the wrapped window
+        '''
+        return TraceWindow(window, self)
+
+    def getch(self, window) -> int:
+        '''
+        Hands out the next recorded key and stores the duration of
+        the frame which was drawn since the last key
+
+        Parameters:
+            window (obj): the curses window
+
+        Returns:
+            int: the key
+        '''
+        now = time.perf_counter()
+        if self.returned is not None:
+            self.frames[-1][1] = now - self.returned
+        if len(self.keys) == 0:
+            raise ReplayFinished()
+        key = self.keys.popleft()
+        self.frames.append([key, 0])
+        self.returned = time.perf_counter()
+        return key
+
+    def input(self, reader) -> str:
+        '''
+        Hands out the next recorded single line input
+
+        Parameters:
+            reader (callable): not called while replaying
+
+        Returns:
+            str: the input
+        '''
+        if len(self.inputs) == 0:
+            return ''
+        return self.inputs.popleft()
+
+    def read(self, path, reader) -> list:
+        '''
+        Hands out the next recorded lines of a file
+
+        Parameters:
+            path (str): the path of the file
+            reader (callable): not called while replaying
+
+        Returns:
+            list: the lines, empty if there are none left
+        '''
+        lines = self.reads.get(path)
+        if not lines:
+            return []
+        return lines.popleft()
+
+    def tick(self) -> None:
+        '''
+        Ticks are fed as keys while replaying
+
+        Returns:
+            void
+        '''
+
+    def wp(self, command, runner) -> tuple:
+        '''
+        Answers a wp command from the trace
+
+        Parameters:
+            command (str): the wp command
+            runner (callable): not called while replaying
+
+        Returns:
+            tuple: the returncode and the output
+        '''
+        return self.replay(command)
+
+    def replay(self, command) -> tuple:
+        '''
+        Returns the next recorded result of a wp command. Results are
+        matched by command, so the order of worker threads doesn't
+        matter.
+
+        Parameters:
+            command (str): the wp command
+
+        Returns:
+            tuple: the returncode and the output
+        '''
+        with self.lock:
+            results = self.outputs.get(command)
+            if not results:
+                raise ReplayError(f"wp {command} is not part of the trace")
+            self.served += 1
+            returncode, output = results.popleft()
+        return returncode, output
+
+    def report(self) -> dict:
+        '''
+        Builds the timing report of the replay
+
+        Returns:
+            dict: the report
+        '''
+        durations = [frame[1] for frame in self.frames]
+        report = {
+            'trace': self.path,
+            'wall_time': round(time.perf_counter() - self.started, 6),
+            'frame_count': len(durations),
+            'ticks': sum(1 for frame in self.frames if frame[0] == -1),
+            'wp_calls': self.served,
+            'keys_left': len(self.keys)
+        }
+        if len(durations) != 0:
+            ordered = sorted(durations)
+            report['frame_time'] = {
+                'mean': round(mean(durations), 6),
+                'median': round(median(durations), 6),
+                'p95': round(ordered[ceil(len(ordered) * 0.95) - 1], 6),
+                'max': round(ordered[-1], 6)
+            }
+        report['frames'] = [[key, round(duration, 6)] for key, duration in self.frames]
+        return report
+
+@contextmanager
+def pseudo_terminal(rows, cols):
+    '''
+    Runs curses headless on a pseudo terminal with the given size.
+    Everything curses draws is read and discarded, so the drawing
+    costs are part of the measurement without needing a real terminal.
+
+    Parameters:
+        rows (int): the height of the terminal
+        cols (int): the width of the terminal
+
+    Returns:
+        void
+    '''
+    master, slave = pty.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack('HHHH', rows, cols, 0, 0))
+    if os.environ.get('TERM', 'dumb') == 'dumb':
+        os.environ['TERM'] = 'xterm-256color'
+
+    def drain():
+        while True:
+            try:
+                if not os.read(master, 65536):
+                    break
+            except OSError:
+                break
+
+    drainer = threading.Thread(target=drain, daemon=True)
+    drainer.start()
+
+    sys.stdout.flush()
+    saved = [os.dup(0), os.dup(1)]
+    os.dup2(slave, 0)
+    os.dup2(slave, 1)
+    try:
+        yield
+    finally:
+        os.dup2(saved[0], 0)
+        os.dup2(saved[1], 1)
+        os.close(saved[0])
+        os.close(saved[1])
+        os.close(slave)
+        drainer.join(1)
+        os.close(master)
@@ -101,17 +101,25 @@ def draw_content_window(lazywp) -> None:
 
 def draw_content_pad(lazywp):
     '''
-    Adds the content pad to lazywp
+    Adds the content pad to lazywp. Only the visible lines are drawn,
+    so the length of the content doesn't matter. Table headers stay
+    on top while the entries scroll.
 
     Returns:
         curses.pad obj
     '''
     width = lazywp.cols - 26
-    height = len(lazywp.content)
+    visible_lines = lazywp.rows - 5
+    position = lazywp.content_pad_pos
+    if lazywp.has_header == True:
+        lines = lazywp.content[:2] + lazywp.content[position+2:position+visible_lines]
+    else:
+        lines = lazywp.content[position:position+visible_lines]
+    height = max(len(lines), 1)
     pad = curses.newpad(height, width)
 
     counter = 0
-    for line in lazywp.content:
+    for line in lines:
 
         color = lazywp.colors['default']
         string = line[0]
@@ -120,7 +128,7 @@ def draw_content_pad(lazywp):
         pad.addstr(counter, 0, string, color)
         counter += 1
 
-    pad.refresh(lazywp.content_pad_pos, 0, 1, 26, lazywp.rows-5, lazywp.cols-2)
+    pad.refresh(0, 0, 1, 26, lazywp.rows-5, lazywp.cols-2)
 
     return pad
 
@@ -160,6 +168,8 @@ def draw_help_window(lazywp):
     content.append(["Select menu entry and press [enter]"])
     content.append(["Use [tab] to switch between the menu and content"])
     content.append(["Press [?] for help"])
+    content.append(["Press [:] to run a wp command and page its output"])
+    content.append(["Press [P] to start or stop capturing a profile"])
     content.append(["Press [q] to exit lazywp"])
     content.append([" "])
 
@@ -219,7 +229,103 @@ def draw_help_window(lazywp):
                 help_pad_pos -= 1
 
         pad.refresh(help_pad_pos, 0, begin_y+2, begin_x+2, height+1, width-2)
- 
+
+def draw_pager(lazywp, spool, title=''):
+    '''
+    Draws a pager for spooled output. Only the visible lines are
+    read from the spool, so the size of the output doesn't matter.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        spool (obj): the finished spool holding the output
+        title (str): the title of the pager
+
+    Returns:
+        void
+    '''
+    # headless the output is passed on as a message
+    if lazywp.window is None:
+        lazywp.msgbox(spool.lines(0, spool.line_count()))
+        return
+
+    # set dimensions
+    height = lazywp.rows - 2
+    width = lazywp.cols
+    visible_lines = height - 3
+    line_count = spool.line_count()
+    last_position = max(line_count - visible_lines, 0)
+
+    pager = curses.newwin(height, width, 0, 0)
+    position = 0
+    found = -1
+    pattern = ''
+    notice = ''
+
+    key = 0
+    esc = False
+    while esc != True:
+
+        # build the frame
+        pager.erase()
+        pager.attron(lazywp.colors['menu_active_hover'])
+        pager.box()
+        pager.addnstr(0, 2, f" {title} [esc to close] ", width-4)
+        pager.attroff(lazywp.colors['menu_active_hover'])
+
+        # add the visible lines
+        counter = 0
+        for line in spool.lines(position, visible_lines):
+            color = lazywp.colors['default']
+            if position + counter == found:
+                color = lazywp.colors['entry_active']
+            pager.addnstr(counter+1, 1, line.expandtabs(4).replace('\0', ''), width-2, color)
+            counter += 1
+
+        # add the position and the search help
+        status = f" {min(position+visible_lines, line_count)}/{line_count} | /: search | n/N: next/previous {notice}"
+        pager.addnstr(height-2, 1, status.ljust(width-2), width-2, lazywp.colors['default_inverted'])
+        pager.refresh()
+
+        key = lazywp.window.getch()
+
+        # detect esc
+        if key == 27:
+            pager.clear()
+            pager.refresh()
+            esc = True
+
+        # scrolling position
+        if key == curses.KEY_DOWN:
+            position += 1
+        elif key == curses.KEY_UP:
+            position -= 1
+        elif key == curses.KEY_NPAGE or key == ord(' '):
+            position += visible_lines
+        elif key == curses.KEY_PPAGE:
+            position -= visible_lines
+        elif key == curses.KEY_HOME or key == ord('g'):
+            position = 0
+        elif key == curses.KEY_END or key == ord('G'):
+            position = last_position
+
+        # search the spool
+        if key == ord('/'):
+            pattern = lazywp.slinputbox(['Search for']).strip()
+            found = spool.search(pattern, position)
+        elif key == ord('n') and pattern != '':
+            found = spool.search(pattern, max(found, position-1) + 1)
+        elif key == ord('N') and pattern != '':
+            found = spool.search(pattern, max(found, position), True)
+
+        if key in [ord('/'), ord('n'), ord('N')]:
+            notice = ''
+            if found == -1:
+                notice = f"| not found: {pattern}"
+            elif found < position or found >= position + visible_lines:
+                position = found
+
+        position = min(max(position, 0), last_position)
+
 def draw_table_header(headers, lazywp) -> list:
     '''
     Generates a string which simulates table header.
@@ -299,7 +405,48 @@ def draw_table_entry(entries, color, lazywp):
         formatted_entries.append(entry_text)
 
     return '|'.join(formatted_entries)
+
+def draw_table_row(cells, lazywp) -> str:
+    '''
+    Generates a string which simulates a table row. Unlike
+    draw_table_entry() the cells are a list, so equal values don't
+    collapse, and too long values are cut off.
+
+    Parameters:
+        cells (list): list of [text, width] pairs, width 0 is flexible
+        lazywp (obj): the lazywp object
+
+    Returns:
+        str: the content
+    '''
+    widths = [cell[1] for cell in cells]
+    flex_width = lazywp.cols - 26 - sum(widths) - (len(cells) - 1) - 2
+
+    formatted_cells = []
+    for text, width in cells:
+        if width == 0:
+            width = flex_width
+        text = str(text)[:width]
+        formatted_cells.append(text + (" " * (width - len(text))))
+
+    return '|'.join(formatted_cells)
  
+def format_size(size) -> str:
+    '''
+    Formats an amount of bytes for humans
+
+    Parameters:
+        size (int): the amount of bytes
+
+    Returns:
+        str: the formatted size
+    '''
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
 def msgbox(lazywp, messages=[]):
     '''
     Builds a messagebox
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.trace import TraceWindow
+
+def fan_out(lazywp, jobs, worker, on_result, workers=4, on_progress=None, interval=0.2) -> bool:
+    '''
+    Runs a worker for every job on a bounded pool of threads. Results
+    are handed to on_result in the main thread as soon as they are
+    done, so the callbacks may draw. Pressing esc stops the fan out
+    after the running jobs have finished. Blocking input is restored
+    afterwards.
+
+    Parameters:
+        lazywp (obj): the lazywp object
+        jobs (list): the jobs
+        worker (callable): gets a job and returns its result, runs in a thread
+        on_result (callable): gets the job and its result
+        workers (int): the maximum amount of parallel workers
+        on_progress (callable): called at most every interval seconds
+        interval (float): seconds between progress calls
+
+    Returns:
+        bool: true if all jobs have been run, false if it was cancelled
+    '''
+    # poll the curses window itself, polling isn't part of a trace
+    window = lazywp.window
+    if isinstance(window, TraceWindow):
+        window = window.window
+
+    cancelled = False
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            pending = {pool.submit(worker, job): job for job in jobs}
+            while pending:
+                done, _ = wait(pending, timeout=interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    on_result(job, future.result())
+
+                if on_progress is not None:
+                    on_progress()
+
+                # check for esc without blocking
+                if cancelled == False and window is not None:
+                    window.timeout(0)
+                    if window.getch() == 27:
+                        cancelled = True
+                        for future in list(pending):
+                            if future.cancel():
+                                pending.pop(future)
+    finally:
+        # dialogs after the fan out wait for keys again
+        if window is not None:
+            window.timeout(-1)
+    return cancelled == False